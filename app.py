@@ -1,5 +1,6 @@
 import sys
 import os
+import multiprocessing
 
 # 添加项目根目录到Python路径
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -15,4 +16,6 @@ def main():
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
+    # 打包后的程序中，解析用的子进程需要此调用
+    multiprocessing.freeze_support()
     main() 
\ No newline at end of file
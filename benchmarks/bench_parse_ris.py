@@ -0,0 +1,71 @@
+"""RIS解析性能对比：旧的逐行 strip 解析 与 当前的续行状态机
+
+用法:
+    python benchmarks/bench_parse_ris.py [RIS文件] [--copies N] [--repeat N]
+
+不指定文件时使用 resources/ceshi.ris；文件内容重复 N 次以得到足够大的输入。
+只比较串行解析，不启用进程池。
+"""
+import argparse
+import os
+import sys
+import time
+from collections import defaultdict
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from core.paper_processor import _parse_ris_serial
+
+
+def legacy_parse_ris(content):
+    """续行支持之前的解析方式（每行 strip，长度不超过6的行被丢弃）"""
+    entries = []
+    current_entry = defaultdict(list)
+    for line in content.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        if line == 'ER  -':
+            if current_entry:
+                current_entry['C1'] = []
+                current_entry['C2'] = []
+                current_entry['LB'] = []
+                entries.append(dict(current_entry))
+                current_entry = defaultdict(list)
+        elif len(line) > 6:
+            current_entry[line[:2]].append(line[6:].strip())
+    if current_entry:
+        entries.append(dict(current_entry))
+    return entries
+
+
+def best_time(func, content, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(content)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='RIS解析性能对比')
+    parser.add_argument('file', nargs='?', default=os.path.join(project_root, 'resources', 'ceshi.ris'))
+    parser.add_argument('--copies', type=int, default=2000, help='输入内容重复次数')
+    parser.add_argument('--repeat', type=int, default=5, help='每种解析方式运行次数，取最快一次')
+    args = parser.parse_args()
+
+    with open(args.file, 'r', encoding='utf-8-sig') as f:
+        content = '\n'.join([f.read()] * args.copies)
+
+    legacy = best_time(legacy_parse_ris, content, args.repeat)
+    current = best_time(_parse_ris_serial, content, args.repeat)
+    print(f'输入: {len(content) / 1024 / 1024:.1f} MB, 条目 {len(_parse_ris_serial(content))}')
+    print(f'旧解析:   {legacy:.3f} s')
+    print(f'状态机:   {current:.3f} s ({legacy / current:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -12,7 +12,8 @@ def collect_data_files():
             'config.json',
             'ratings/*.json',
             'criteria/*.json',
-            'profiles/*.json'
+            'profiles/*.json',
+            'aliases/*.json'
         ],
         'resources': [
             'filter.ico',
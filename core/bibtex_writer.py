@@ -0,0 +1,229 @@
+import re
+from typing import Dict, List
+
+from .dedup import entry_doi
+from .rating_index import normalize_issns
+
+# RIS 文献类型 -> BibTeX 条目类型，未列出的类型写为 misc
+BIBTEX_TYPES = {
+    'JOUR': 'article',
+    'EJOUR': 'article',
+    'MGZN': 'article',
+    'CONF': 'inproceedings',
+    'CPAPER': 'inproceedings',
+    'BOOK': 'book',
+    'EBOOK': 'book',
+    'CHAP': 'incollection',
+    'ECHAP': 'incollection',
+    'THES': 'phdthesis',
+    'RPRT': 'techreport',
+}
+
+# 生成 citation key 时跳过的标题首词
+KEY_STOPWORDS = frozenset(["a", "the", "an", "and", "or", "but", "if",
+                           "because", "as", "until", "while", "by"])
+
+# 期刊/会议名称依次尝试的标签
+_CONTAINER_TAGS = ('T2', 'JO', 'JF', 'J2', 'BT')
+
+_KEY_INVALID = re.compile(r'[^\w\-]+')
+_YEAR = re.compile(r'\d{4}')
+_SPECIAL = re.compile(r'[\\{}&%$#_]')
+_ESCAPES = {
+    '\\': r'\textbackslash{}',
+    '{': r'\{',
+    '}': r'\}',
+    '&': r'\&',
+    '%': r'\%',
+    '$': r'\$',
+    '#': r'\#',
+    '_': r'\_',
+}
+
+
+def _first(entry, *tags) -> str:
+    for tag in tags:
+        values = entry.get(tag)
+        if values:
+            return values[0]
+    return ''
+
+
+def entry_year(entry) -> str:
+    """条目的四位年份，依次查找 PY / Y1 / DA，没有时返回空字符串"""
+    for tag in ('PY', 'Y1', 'DA'):
+        for value in entry.get(tag, ()):
+            match = _YEAR.search(value)
+            if match:
+                return match.group()
+    return ''
+
+
+def entry_issns(entry) -> List[str]:
+    """SN字段中提取出的所有ISSN，格式为 0140-9883，不重复"""
+    issns = []
+    for value in entry.get('SN', ()):
+        for issn in normalize_issns(value):
+            issn = f'{issn[:4]}-{issn[4:]}'
+            if issn not in issns:
+                issns.append(issn)
+    return issns
+
+
+def citation_key_base(entry) -> str:
+    """citation key 的基础部分：第一作者姓 + 年份 + 标题第一个非停用词
+
+    只保留字母、数字、下划线和连字符；三部分都缺失时返回 'ref'。
+    """
+    author = _first(entry, 'AU', 'A1').split(',')[0]
+    word = ''
+    for item in _first(entry, 'TI', 'T1').split(' '):
+        # 去掉单词首尾的标点符号
+        item = item.strip('.,;:!?()[]{}"\'-')
+        if item and item.lower() not in KEY_STOPWORDS:
+            word = item
+            break
+    base = _KEY_INVALID.sub('', author + entry_year(entry) + word)
+    return base or 'ref'
+
+
+def _suffix(index: int) -> str:
+    """第 index 个冲突后缀：a, b, ..., z, aa, ab, ..."""
+    letters = ''
+    index += 1
+    while index:
+        index, rest = divmod(index - 1, 26)
+        letters = chr(ord('a') + rest) + letters
+    return letters
+
+
+class CitationKeyRegistry:
+    """分配不重复的 citation key
+
+    已用的 key 保存在集合中，每个基础 key 记住下一个待尝试的后缀，
+    冲突时依次追加 a, b, c, ...，分配一个 key 的代价与已分配的数量无关。
+    同一个条目（按 id）多次请求得到同一个 key，条目须在登记表使用期间保持存活。
+    """
+
+    def __init__(self):
+        self._used = set()
+        self._next_suffix: Dict[str, int] = {}
+        self._keys: Dict[int, str] = {}
+
+    def reserve(self, base: str) -> str:
+        """登记并返回以 base 为基础、尚未使用的 key"""
+        key = base
+        if key in self._used:
+            index = self._next_suffix.get(base, 0)
+            key = base + _suffix(index)
+            while key in self._used:
+                index += 1
+                key = base + _suffix(index)
+            self._next_suffix[base] = index + 1
+        self._used.add(key)
+        return key
+
+    def key_for(self, entry) -> str:
+        """条目的 citation key，优先以条目已有的 LB 为基础"""
+        key = self._keys.get(id(entry))
+        if key is None:
+            label = _KEY_INVALID.sub('', _first(entry, 'LB'))
+            key = self.reserve(label or citation_key_base(entry))
+            self._keys[id(entry)] = key
+        return key
+
+    def __len__(self):
+        return len(self._used)
+
+
+def escape_bibtex(value: str) -> str:
+    """转义 BibTeX 中的特殊字符"""
+    # 逐字符 translate 对长摘要很慢，正则只在出现特殊字符的位置替换
+    return _SPECIAL.sub(lambda match: _ESCAPES[match.group()], value)
+
+
+def bibtex_fields(entry):
+    """按固定顺序生成条目的 (字段, 值) 对，值未转义"""
+    entry_type = BIBTEX_TYPES.get(_first(entry, 'TY'), 'misc')
+    authors = list(entry.get('AU', ())) or list(entry.get('A1', ()))
+    if authors:
+        yield 'author', ' and '.join(authors)
+    title = _first(entry, 'TI', 'T1')
+    if title:
+        yield 'title', title
+    container = _first(entry, *_CONTAINER_TAGS)
+    if container:
+        if entry_type in ('inproceedings', 'incollection'):
+            yield 'booktitle', container
+        else:
+            yield 'journal', container
+    year = entry_year(entry)
+    if year:
+        yield 'year', year
+    for field, tag in (('volume', 'VL'), ('number', 'IS')):
+        value = _first(entry, tag)
+        if value:
+            yield field, value
+    start, end = _first(entry, 'SP'), _first(entry, 'EP')
+    if start:
+        yield 'pages', f'{start}--{end}' if end else start
+    publisher = _first(entry, 'PB')
+    if publisher:
+        yield 'publisher', publisher
+    # SN / DO 中常混有其他内容（如 "ARTN 107353"），只写出能识别的 ISSN 和 DOI
+    issns = entry_issns(entry)
+    if issns:
+        yield 'issn', ', '.join(issns)
+    doi = entry_doi(entry)
+    if doi:
+        yield 'doi', doi
+    url = _first(entry, 'UR')
+    if url:
+        yield 'url', url
+    # 关键词可能以续行的形式写在同一个KW中
+    keywords = [keyword.strip() for value in entry.get('KW', ())
+                for keyword in value.split('\n') if keyword.strip()]
+    if keywords:
+        yield 'keywords', ', '.join(keywords)
+    abstract = _first(entry, 'AB')
+    if abstract:
+        yield 'abstract', abstract
+    # C2 中的期刊评级，例如 "CCF:A; FMS:B;"
+    ratings = entry.get('C2')
+    if ratings:
+        yield 'note', ' '.join(ratings)
+
+
+def format_bibtex_entry(entry, key: str) -> str:
+    """把一个条目格式化为 BibTeX 文本（以换行结尾）"""
+    entry_type = BIBTEX_TYPES.get(_first(entry, 'TY'), 'misc')
+    lines = [f'@{entry_type}{{{key},']
+    for field, value in bibtex_fields(entry):
+        if '\n' in value:
+            # 续行合并为一行
+            value = ' '.join(value.split())
+        lines.append(f'  {field} = {{{escape_bibtex(value)}}},')
+    lines.append('}')
+    lines.append('')
+    return '\n'.join(lines)
+
+
+def bibtex_formatter(registry: CitationKeyRegistry):
+    """返回 formatter(entry) -> BibTeX 文本，key 由 registry 分配（供 write_outputs 使用）"""
+    def formatter(entry):
+        return format_bibtex_entry(entry, registry.key_for(entry))
+    return formatter
+
+
+def iter_bibtex(entries, registry: CitationKeyRegistry = None):
+    """逐个生成条目的 BibTeX 文本，不在内存中拼接整个文件"""
+    if registry is None:
+        registry = CitationKeyRegistry()
+    formatter = bibtex_formatter(registry)
+    for entry in entries:
+        yield formatter(entry)
+
+
+def to_bibtex(entries, registry: CitationKeyRegistry = None) -> str:
+    """将多个条目转换为 BibTeX 字符串，条目之间空一行"""
+    return '\n'.join(iter_bibtex(entries, registry))
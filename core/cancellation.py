@@ -0,0 +1,63 @@
+import threading
+
+
+class ProcessingCancelled(Exception):
+    """处理被用户取消
+
+    Attributes:
+        partial_written: 是否已经写出了取消前完成的部分结果；在分类完成之前取消时，
+            即使请求保留部分结果也没有可写出的内容
+    """
+
+    def __init__(self, partial_written: bool = False):
+        super().__init__()
+        self.partial_written = partial_written
+
+
+class CancellationToken:
+    """协作式的取消和暂停
+
+    界面线程调用 cancel / pause / resume，处理线程在阶段之间和每条翻译之间
+    调用 check 或 wait：暂停时在这里阻塞，取消后停止处理。
+    """
+
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+        self.keep_partial = False
+
+    def cancel(self, keep_partial: bool = False):
+        """请求取消
+
+        Args:
+            keep_partial: 是否写出取消前已完成的部分结果
+        """
+        self.keep_partial = keep_partial
+        self._cancelled.set()
+        # 唤醒处于暂停中的处理线程
+        self._running.set()
+
+    def pause(self):
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def paused(self) -> bool:
+        return not self._running.is_set()
+
+    def wait(self) -> bool:
+        """暂停时阻塞直到继续或取消，返回是否已取消"""
+        self._running.wait()
+        return self._cancelled.is_set()
+
+    def check(self):
+        """暂停时阻塞，已取消时抛出 ProcessingCancelled"""
+        if self.wait():
+            raise ProcessingCancelled()
@@ -2,6 +2,7 @@ import json
 import os
 from typing import Dict, List, Optional
 from .data_types import *
+from utils.atomic_io import atomic_write_json
 
 class DataManager:
     """数据管理类"""
@@ -19,10 +20,12 @@ class DataManager:
         self.rating_data: Dict[RatingSystem, List[JournalRating]] = {}
         self.selection_criteria: Dict[str, Dict[RatingSystem, List[str]]] = {}
         self.selection_profiles: Dict[str, Dict[str, Dict[RatingSystem, List[str]]]] = {}
+        self.journal_aliases: Dict[str, str] = {}
         
         # 创建必要的目录
         self.criteria_dir = os.path.join(self.base_path, 'criteria')
         self.profiles_dir = os.path.join(self.base_path, 'profiles')
+        self.aliases_dir = os.path.join(self.base_path, 'aliases')
         os.makedirs(self.criteria_dir, exist_ok=True)
         os.makedirs(self.profiles_dir, exist_ok=True)
         
@@ -44,6 +47,11 @@ class DataManager:
                 if system in rating_systems:  # 只加载已定义的评级系统的文件路径
                     abs_path = os.path.join(self.base_path, rel_path)
                     rating_file_paths[system] = abs_path
+            
+            identifier_file_path = os.path.join(
+                self.base_path,
+                config_data.get('identifier_file_path') or os.path.join('ratings', 'identifiers.json')
+            )
                 
             return DataConfig(
                 rating_systems=rating_systems,
@@ -52,7 +60,13 @@ class DataManager:
                 token_missuo=config_data.get('token_missuo', ''),
                 token_linuxdo=config_data.get('token_linuxdo', ''),
                 output_directory=config_data.get('output_directory', ''),
-                subfolder=config_data.get('subfolder', '')
+                subfolder=config_data.get('subfolder', ''),
+                identifier_file_path=identifier_file_path,
+                journal_tags=config_data.get('journal_tags') or DataConfig().journal_tags,
+                resolution_cache=config_data.get('resolution_cache', True),
+                near_duplicate_mode=config_data.get('near_duplicate_mode', ''),
+                library=config_data.get('library', False),
+                output_formats=config_data.get('output_formats') or DataConfig().output_formats
             )
         except FileNotFoundError:
             # 如果配置文件不存在，返回默认配置
@@ -70,6 +84,9 @@ class DataManager:
         
         # 加载组合筛选标准
         self._load_all_profiles()
+        
+        # 加载期刊名称别名
+        self._load_all_aliases()
     
     def _load_rating_data(self, system: RatingSystem, file_path: str) -> List[JournalRating]:
         """加载评级数据"""
@@ -140,8 +157,7 @@ class DataManager:
         for system_id, system_criteria in criteria.items():
             data[system_id] = system_criteria
         
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        atomic_write_json(file_path, data, indent=2)
             
         # 更新内存中的数据
         self.selection_criteria[name] = criteria
@@ -164,8 +180,7 @@ class DataManager:
             'criteria_sets': profile
         }
         
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        atomic_write_json(file_path, data, indent=2)
             
         # 更新内存中的数据
         self.selection_profiles[name] = profile
@@ -208,10 +223,45 @@ class DataManager:
         except:
             return False
     
+    def _load_all_aliases(self):
+        """加载 aliases 目录下所有别名文件（别名 -> 规范名称），按文件名顺序合并，后加载的覆盖先加载的"""
+        if not os.path.exists(self.aliases_dir):
+            return
+            
+        for file_name in sorted(os.listdir(self.aliases_dir)):
+            if file_name.endswith('.json'):
+                file_path = os.path.join(self.aliases_dir, file_name)
+                try:
+                    with open(file_path, 'r', encoding='utf-8') as f:
+                        aliases = json.load(f)
+                    self.journal_aliases.update(
+                        (variant, canonical) for variant, canonical in aliases.items()
+                        if variant and canonical
+                    )
+                except Exception as e:
+                    print(f"加载别名文件 {file_path} 时出错: {str(e)}")
+                    continue
+    
+    def get_journal_aliases(self) -> Dict[str, str]:
+        """获取期刊名称别名 -> 规范名称"""
+        return self.journal_aliases
+    
     def get_rating_data(self, system: RatingSystem) -> List[JournalRating]:
         """获取评级数据"""
         return self.rating_data.get(system, [])
     
+    def get_resolution_cache_path(self) -> Optional[str]:
+        """获取期刊解析缓存文件路径，未启用缓存时返回None"""
+        if not self.config.resolution_cache:
+            return None
+        return os.path.join(self.base_path, 'cache', 'journal_resolution.json')
+    
+    def get_library_path(self) -> Optional[str]:
+        """获取跨运行文献库路径，未启用时返回None"""
+        if not self.config.library:
+            return None
+        return os.path.join(self.base_path, 'library', 'library.sqlite3')
+    
     def get_selection_criteria(self) -> Dict[str, Dict[RatingSystem, List[str]]]:
         """获取所有基础筛选标准"""
         return self.selection_criteria
@@ -243,8 +293,7 @@ class DataManager:
                 item[mapping['type']] = rating.type
             data.append(item)
             
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        atomic_write_json(file_path, data, indent=2)
             
         # 更新内存中的数据
         self.rating_data[system] = ratings
@@ -281,8 +330,7 @@ class DataManager:
                 }
             }
             
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            atomic_write_json(file_path, data, indent=2)
             return True
         except:
             return False
@@ -344,8 +392,7 @@ class DataManager:
                 }
             }
             
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            atomic_write_json(file_path, data, indent=2)
             return True
         except:
             return False
@@ -389,8 +436,7 @@ class DataManager:
                 }
             }
             
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            atomic_write_json(file_path, data, indent=2)
             return True
         except:
             return False
@@ -408,11 +454,19 @@ class DataManager:
                 'token_missuo': self.config.token_missuo,
                 'token_linuxdo': self.config.token_linuxdo,
                 'output_directory': self.config.output_directory,
-                'subfolder': self.config.subfolder
+                'subfolder': self.config.subfolder,
+                'identifier_file_path': (
+                    os.path.relpath(self.config.identifier_file_path, self.base_path)
+                    if self.config.identifier_file_path else ''
+                ),
+                'journal_tags': self.config.journal_tags,
+                'resolution_cache': self.config.resolution_cache,
+                'near_duplicate_mode': self.config.near_duplicate_mode,
+                'library': self.config.library,
+                'output_formats': self.config.output_formats
             }
             
-            with open(self.config_path, 'w', encoding='utf-8') as f:
-                json.dump(config_data, f, ensure_ascii=False, indent=4)
+            atomic_write_json(self.config_path, config_data, indent=4)
             return True
         except Exception as e:
             print(f"保存配置文件出错：{str(e)}")
@@ -601,6 +655,7 @@ class DataManager:
             self.rating_data.clear()
             self.selection_criteria.clear()
             self.selection_profiles.clear()
+            self.journal_aliases.clear()
             
             # 重新加载所有数据
             self._load_all_data()
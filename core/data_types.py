@@ -45,3 +45,9 @@ class DataConfig:
     token_linuxdo: str = ""  # LinuxDo翻译令牌
     output_directory: str = ""  # 输出目录
     subfolder: str = ""  # 子文件夹名称
+    identifier_file_path: str = ""  # 补充标识映射文件路径(ISSN/DOI前缀 -> 期刊名称)
+    journal_tags: List[str] = field(default_factory=lambda: ['T2', 'JO', 'JF', 'J2', 'BT'])  # 依次尝试的期刊名称标签
+    resolution_cache: bool = True  # 是否在运行之间缓存期刊评级解析结果
+    near_duplicate_mode: str = ""  # 近似重复处理方式: "merge" / "flag" / "" 不处理
+    library: bool = False  # 是否启用跨运行文献库(增量处理)
+    output_formats: List[str] = field(default_factory=lambda: ['ris'])  # 输出格式: 'ris' / 'bib' / 'csv' / 'parquet' / 'jsonl'
@@ -0,0 +1,398 @@
+import hashlib
+import re
+import zlib
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .rating_index import normalize_doi
+from .ris_reader import RisIndex, count_tags, extract_fields
+
+# 指纹所用的字段：DOI、标题、年份、第一作者
+FINGERPRINT_TAGS = ('DO', 'TI', 'PY', 'AU')
+
+
+def normalize_dedup_title(title) -> str:
+    """规范化标题用于去重：忽略大小写并合并空白"""
+    return ' '.join(str(title).casefold().split())
+
+
+def first_author_key(author) -> str:
+    """第一作者的姓，如 Chen, L. F. -> chen"""
+    return str(author).split(',')[0].strip().casefold()
+
+
+def entry_doi(entry) -> Optional[str]:
+    """条目的规范化DOI，取DO字段中第一个有效的DOI"""
+    for value in entry.get('DO', ()):
+        doi = normalize_doi(value)
+        if doi:
+            return doi
+    return None
+
+
+def title_year_key(entry) -> Optional[str]:
+    """条目的 规范化标题 + 年份 去重键，没有标题时返回None"""
+    if not entry.get('TI') or not entry['TI'][0].strip():
+        return None
+    year = entry['PY'][0].strip()[:4] if entry.get('PY') else ''
+    return f"{normalize_dedup_title(entry['TI'][0])}|{year}"
+
+
+# 只保留一个值的标签：合并时保留主条目的值，主条目缺失时才取另一条的值
+SINGLE_VALUE_TAGS = frozenset([
+    'TY', 'TI', 'T1', 'ST', 'PY', 'Y1', 'DA', 'T2', 'JO', 'JF', 'J2', 'BT', 'T3',
+    'AB', 'N2', 'VL', 'IS', 'SP', 'EP', 'DO', 'LA', 'ET', 'PB', 'CY',
+])
+
+
+def merge_entries(base, other):
+    """把 other 中的信息合并进 base（就地修改并返回 base）
+
+    多值标签（作者、关键词、链接等）按集合语义取并集并保持原有顺序；
+    SINGLE_VALUE_TAGS 中的标签只在 base 缺失时从 other 补充。
+    """
+    for tag, values in other.items():
+        if not values:
+            continue
+        current = base.get(tag)
+        if not current:
+            base[tag] = list(values)
+        elif tag not in SINGLE_VALUE_TAGS:
+            seen = set(current)
+            additions = [value for value in values if value not in seen and not seen.add(value)]
+            if additions:
+                base[tag] = list(current) + additions
+    return base
+
+
+def entry_fingerprint(title, year='', author='') -> int:
+    """由规范化标题 + 年份 + 第一作者生成 64 位指纹"""
+    return _hash64(f'{normalize_dedup_title(title)}|{str(year).strip()[:4]}|{first_author_key(author)}')
+
+
+def _hash64(text) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class DuplicateIndex:
+    """DOI 优先、标题+年份 兜底的重复判断
+
+    有DOI的条目只按DOI匹配，或匹配到一个没有DOI但标题相同的已有条目；
+    没有DOI的条目按标题匹配。这样标题相同（如 "Editorial"）但DOI不同的文献不会被合并。
+    两个键都没有的条目不参与去重。所有查找都是哈希表操作，整体为线性时间。
+    """
+
+    def __init__(self):
+        self.doi_slots: Dict[object, int] = {}
+        self.title_slots: Dict[object, int] = {}
+        self.slot_has_doi = bytearray()
+        self.removed = {'doi': 0, 'title': 0}
+
+    def match(self, doi_key, title_key) -> Tuple[Optional[int], Optional[str]]:
+        """查找重复的槽位
+
+        Returns:
+            (槽位, 命中的规则 'doi' / 'title')，没有重复时为 (None, None)
+        """
+        if doi_key is not None:
+            slot = self.doi_slots.get(doi_key)
+            if slot is not None:
+                return slot, 'doi'
+        if title_key is not None:
+            slot = self.title_slots.get(title_key)
+            if slot is not None and (doi_key is None or not self.slot_has_doi[slot]):
+                return slot, 'title'
+        return None, None
+
+    def add(self, doi_key, title_key) -> int:
+        """登记一个新的槽位并返回其编号"""
+        slot = len(self.slot_has_doi)
+        self.slot_has_doi.append(doi_key is not None)
+        if doi_key is not None:
+            self.doi_slots[doi_key] = slot
+        if title_key is not None:
+            self.title_slots.setdefault(title_key, slot)
+        return slot
+
+    def record_duplicate(self, slot, rule, doi_key):
+        """登记一次重复；没有DOI的槽位被带DOI的重复条目补上DOI"""
+        self.removed[rule] += 1
+        if doi_key is not None and not self.slot_has_doi[slot]:
+            self.slot_has_doi[slot] = True
+            self.doi_slots.setdefault(doi_key, slot)
+
+
+class StreamGroups:
+    """流式去重的结果：每个保留下来的记录一组
+
+    偏移和长度保存在紧凑的 array 中（每条记录16字节），只有确实重复的记录
+    在 duplicates 中另外保存偏移；遍历时才逐组生成列表，不会为每条记录建立Python对象。
+    """
+
+    def __init__(self, offsets: array, lengths: array,
+                 duplicates: Dict[int, List[Tuple[int, int]]]):
+        self.offsets = offsets
+        self.lengths = lengths
+        self.duplicates = duplicates
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __iter__(self) -> Iterator[List[Tuple[int, int]]]:
+        """依次生成每组的 (偏移, 长度) 列表，第一条为主记录"""
+        duplicates = self.duplicates
+        for slot, (offset, length) in enumerate(zip(self.offsets, self.lengths)):
+            yield [(offset, length)] + duplicates.get(slot, [])
+
+
+def stream_deduplicate(ris_index: RisIndex) -> Tuple[StreamGroups, Dict[str, int]]:
+    """流式去重：只保存指纹和字节偏移，不把条目读入内存
+
+    内存占用只与不同记录的数量有关（每条约几十字节），与记录本身的大小无关，
+    适合合并后体积很大的导出文件。规则与 DuplicateIndex 相同，标题指纹额外
+    包含第一作者。只有确实重复的记录才额外保存其偏移，供读取时合并。
+
+    Args:
+        ris_index: RIS文件的 RisIndex，由调用方打开和关闭，之后可继续用于按偏移读取记录，
+            不需要再扫描一次文件
+
+    Returns:
+        (StreamGroups, 各规则删除的重复记录数)；遍历 StreamGroups 得到每组记录的
+        (偏移, 长度) 列表，组按首次出现的位置排列，组内第一条为标签最多的记录，
+        其余为需要并入的重复记录
+    """
+    index = DuplicateIndex()
+    offsets = array('q')
+    lengths = array('q')
+    scores = array('l')
+    duplicates: Dict[int, List[Tuple[int, int]]] = {}
+
+    for offset, length, raw in ris_index.records():
+        fields = extract_fields(raw, FINGERPRINT_TAGS, ris_index.encoding)
+        doi = normalize_doi(fields['DO']) if fields.get('DO') else None
+        doi_key = _hash64(doi) if doi else None
+        title_key = (entry_fingerprint(fields['TI'], fields.get('PY', ''), fields.get('AU', ''))
+                     if fields.get('TI') else None)
+        score = count_tags(raw)
+
+        slot, rule = index.match(doi_key, title_key)
+        if slot is None:
+            index.add(doi_key, title_key)
+            offsets.append(offset)
+            lengths.append(length)
+            scores.append(score)
+        else:
+            index.record_duplicate(slot, rule, doi_key)
+            members = duplicates.setdefault(slot, [])
+            # 标签更多的记录作为主记录，位置仍沿用第一次出现的位置
+            if score > scores[slot]:
+                members.append((offsets[slot], lengths[slot]))
+                offsets[slot] = offset
+                lengths[slot] = length
+                scores[slot] = score
+            else:
+                members.append((offset, length))
+
+    return StreamGroups(offsets, lengths, duplicates), index.removed
+
+
+# ---------------------------------------------------------------------------
+# 近似重复：MinHash + LSH
+# ---------------------------------------------------------------------------
+
+_MASK64 = (1 << 64) - 1
+_SHINGLE_WORD_RE = re.compile(r'[\W_]+')
+
+# 标题字符 n-gram 长度，摘要单词 n-gram 长度
+TITLE_SHINGLE_SIZE = 5
+ABSTRACT_SHINGLE_SIZE = 3
+# 只取摘要的前若干个词，控制每个条目的开销
+ABSTRACT_MAX_WORDS = 120
+# 少于该词数的标题（如 "Editorial"）只凭标题相似不足以判定重复，还需要摘要相似
+SHORT_TITLE_WORDS = 5
+# 同一簇内允许的最大年份差（预印本与正式发表）
+NEAR_DUPLICATE_MAX_YEAR_GAP = 1
+
+
+def _entry_year_number(entry):
+    """PY 的前四位年份，没有或无法识别时返回None"""
+    if not entry.get('PY'):
+        return None
+    year = entry['PY'][0].strip()[:4]
+    return int(year) if year.isdigit() else None
+
+
+def _shingle_hash(text) -> int:
+    # 内置 hash 对 str 每个进程随机化，近似重复的结果会随运行变化；crc32 稳定且足够快
+    return zlib.crc32(text.encode('utf-8'))
+
+
+def title_shingles(title):
+    """标题的字符 n-gram 哈希集合，忽略大小写和标点"""
+    text = ' '.join(_SHINGLE_WORD_RE.sub(' ', str(title).casefold()).split())
+    n = TITLE_SHINGLE_SIZE
+    return {_shingle_hash(text[i:i + n]) for i in range(max(1, len(text) - n + 1))}
+
+
+def abstract_shingles(abstract):
+    """摘要前 ABSTRACT_MAX_WORDS 个词的单词 n-gram 哈希集合"""
+    words = _SHINGLE_WORD_RE.sub(' ', str(abstract).casefold()).split()[:ABSTRACT_MAX_WORDS]
+    n = ABSTRACT_SHINGLE_SIZE
+    return {_shingle_hash(' '.join(words[i:i + n])) for i in range(max(1, len(words) - n + 1))}
+
+
+def minhash_signature(shingles, num_perm=64):
+    """单次置换 MinHash（one permutation hashing）
+
+    每个 shingle 只哈希一次，按哈希值分到 num_perm 个桶中取桶内最小值，
+    空桶用下一个非空桶的值补齐（循环致密化），开销与 shingle 数成正比。
+    """
+    bins = [None] * num_perm
+    for h in shingles:
+        h = (h * 0x9E3779B97F4A7C15) & _MASK64  # 把32位的 crc32 打散到64位
+        index = h % num_perm
+        value = h // num_perm
+        current = bins[index]
+        if current is None or value < current:
+            bins[index] = value
+    if any(value is None for value in bins):
+        filled = [i for i, value in enumerate(bins) if value is not None]
+        if not filled:
+            return tuple([0] * num_perm)
+        for i in range(num_perm):
+            if bins[i] is None:
+                # 取循环意义上的下一个非空桶，加上偏移区分来源
+                donor = next((j for j in filled if j > i), filled[0])
+                bins[i] = bins[donor] + (donor - i) % num_perm
+    return tuple(bins)
+
+
+def estimate_similarity(sig_a, sig_b) -> float:
+    """两个签名相同位置相等的比例，即 Jaccard 相似度的估计"""
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+def find_near_duplicates(entries, threshold=0.8, num_perm=64, bands=16, use_abstract=True):
+    """用 MinHash + LSH 查找近似重复的条目
+
+    标题和摘要各自生成签名并按 bands 段分桶，同一桶内的条目只与桶内第一个
+    条目比较，通过并查集合并为簇，整体复杂度与条目数近似线性。
+    标题相似度达到阈值即视为重复；两者都有摘要时，也接受标题与摘要相似度
+    的平均值达到阈值（如预印本改了标题）。短标题（少于 SHORT_TITLE_WORDS 个词）
+    还要求摘要相似度达到阈值。
+    DOI 都存在但不同、或年份相差超过 NEAR_DUPLICATE_MAX_YEAR_GAP 的两个簇不会合并，
+    按簇检查，不会经由没有DOI的条目间接连到一起。
+
+    Args:
+        entries: RIS条目列表
+        threshold: 估计的 Jaccard 相似度阈值
+        num_perm: 签名长度
+        bands: LSH 分段数，num_perm 需能被其整除
+        use_abstract: 是否使用摘要
+
+    Returns:
+        List[List[int]]: 每个近似重复簇的条目下标（按原顺序），只包含两个以上条目的簇
+    """
+    rows = num_perm // bands
+    parent = list(range(len(entries)))
+    title_signatures = []
+    abstract_signatures = []
+    short_titles = []
+    buckets = {}
+    # 簇根 -> (DOI, 最早年份, 最晚年份)
+    cluster_info = {}
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def similar(i, j):
+        title_similarity = estimate_similarity(title_signatures[i], title_signatures[j])
+        if abstract_signatures[i] is None or abstract_signatures[j] is None:
+            abstract_similarity = None
+        else:
+            abstract_similarity = estimate_similarity(abstract_signatures[i], abstract_signatures[j])
+        if short_titles[i] or short_titles[j]:
+            return (abstract_similarity is not None and abstract_similarity >= threshold
+                    and (title_similarity + abstract_similarity) / 2 >= threshold)
+        if title_similarity >= threshold:
+            return True
+        return abstract_similarity is not None and (title_similarity + abstract_similarity) / 2 >= threshold
+
+    def combine(root_a, root_b):
+        """两个簇合并后的信息，DOI 冲突或年份跨度过大时返回None"""
+        doi_a, first_a, last_a = cluster_info[root_a]
+        doi_b, first_b, last_b = cluster_info[root_b]
+        if doi_a and doi_b and doi_a != doi_b:
+            return None
+        years = [year for year in (first_a, last_a, first_b, last_b) if year is not None]
+        if years and max(years) - min(years) > NEAR_DUPLICATE_MAX_YEAR_GAP:
+            return None
+        return (doi_a or doi_b, min(years) if years else None, max(years) if years else None)
+
+    for i, entry in enumerate(entries):
+        if not entry.get('TI'):
+            title_signatures.append(None)
+            abstract_signatures.append(None)
+            short_titles.append(True)
+            continue
+        year = _entry_year_number(entry)
+        cluster_info[i] = (entry_doi(entry), year, year)
+        short_titles.append(len(_SHINGLE_WORD_RE.sub(' ', entry['TI'][0]).split()) < SHORT_TITLE_WORDS)
+        title_signatures.append(minhash_signature(title_shingles(entry['TI'][0]), num_perm))
+        abstract_signatures.append(
+            minhash_signature(abstract_shingles(entry['AB'][0]), num_perm)
+            if use_abstract and entry.get('AB') else None)
+
+        for kind, signature in (('TI', title_signatures[i]), ('AB', abstract_signatures[i])):
+            if signature is None:
+                continue
+            for band in range(bands):
+                first = buckets.setdefault((kind, band, signature[band * rows:(band + 1) * rows]), i)
+                if first == i:
+                    continue
+                root_first, root_i = find(first), find(i)
+                if root_first == root_i or not similar(first, i):
+                    continue
+                info = combine(root_first, root_i)
+                if info is not None:
+                    parent[root_i] = root_first
+                    cluster_info[root_first] = info
+
+    clusters = {}
+    for i in range(len(entries)):
+        if title_signatures[i] is not None:
+            clusters.setdefault(find(i), []).append(i)
+    return [members for members in clusters.values() if len(members) > 1]
+
+
+def resolve_near_duplicates(entries, mode='merge', threshold=0.8):
+    """处理近似重复簇
+
+    Args:
+        entries: RIS条目列表
+        mode: 'merge' 每簇合并为最完整的条目（见 merge_entries）；'flag' 保留全部条目，
+              在 C3 标签中写入 "near-duplicate:<簇编号>" 供人工核对
+        threshold: 相似度阈值
+
+    Returns:
+        (处理后的条目列表, 近似重复簇的数量)
+    """
+    clusters = find_near_duplicates(entries, threshold)
+    if mode == 'flag':
+        for group, members in enumerate(clusters, 1):
+            for i in members:
+                entry = entries[i]
+                entry['C3'] = list(entry.get('C3', [])) + [f'near-duplicate:{group}']
+        return entries, len(clusters)
+
+    dropped = set()
+    for members in clusters:
+        keep = max(members, key=lambda i: len(entries[i]))
+        for i in members:
+            if i != keep:
+                merge_entries(entries[keep], entries[i])
+                dropped.add(i)
+    return [entry for i, entry in enumerate(entries) if i not in dropped], len(clusters)
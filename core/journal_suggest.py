@@ -0,0 +1,122 @@
+import csv
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from typing import Dict, List, Tuple
+
+from .rating_index import NOT_FOUND, normalize_title
+
+# 每个未匹配名称最多推荐的候选数
+SUGGESTION_LIMIT = 3
+
+# 推荐候选的最低相似度（difflib ratio）
+MIN_SIMILARITY = 0.6
+
+# 按出现次数只为前若干个未匹配名称计算候选
+MAX_SUGGESTED_JOURNALS = 500
+
+# 按三元组重合数取前若干个名称，再用 difflib 精确打分
+SHORTLIST_SIZE = 30
+
+# 未匹配期刊报告的文件名
+UNMATCHED_FILE_NAME = 'unmatched_journals.csv'
+
+
+def _trigrams(text: str) -> set:
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def format_ratings(ratings: Dict[str, object]) -> str:
+    """评级字典的简短文本，如 'AJG:3; FMS:B'"""
+    return '; '.join(f'{system}:{rating}' for system, rating in ratings.items()
+                     if rating != NOT_FOUND)
+
+
+class JournalNameIndex:
+    """评级文件中全部期刊名称的三元组倒排索引
+
+    查询时先按共同三元组的数量取出少量候选，再用 difflib 计算相似度，
+    不需要与所有名称逐一比较。出现在大量名称中的三元组（如 "jou"）区分度低，
+    统计重合数时跳过。
+    """
+
+    def __init__(self, names: Dict[str, Dict[str, object]]):
+        """
+        Args:
+            names: 期刊名称 -> 评级系统 -> 等级（RatingIndex.names）
+        """
+        self.names = list(names)
+        self.ratings = [names[name] for name in self.names]
+        self.keys = [normalize_title(name) for name in self.names]
+        postings = defaultdict(list)
+        for position, key in enumerate(self.keys):
+            for gram in _trigrams(key):
+                postings[gram].append(position)
+        self.postings = dict(postings)
+        self.max_posting = max(50, len(self.names) // 20)
+
+    @classmethod
+    def from_rating_index(cls, rating_index) -> 'JournalNameIndex':
+        return cls(rating_index.names)
+
+    def suggest(self, name: str, limit: int = SUGGESTION_LIMIT,
+                min_score: float = MIN_SIMILARITY) -> List[Tuple[str, float, Dict[str, object]]]:
+        """为一个名称推荐相似的期刊
+
+        Returns:
+            [(候选名称, 相似度, 评级)]，按相似度从高到低
+        """
+        key = normalize_title(name)
+        lists = [self.postings[gram] for gram in _trigrams(key) if gram in self.postings]
+        rare = [positions for positions in lists if len(positions) <= self.max_posting] or lists
+        counts = Counter()
+        for positions in rare:
+            counts.update(positions)
+
+        matcher = SequenceMatcher(None, '', key)
+        scored = []
+        for position, _ in counts.most_common(SHORTLIST_SIZE):
+            matcher.set_seq1(self.keys[position])
+            if matcher.real_quick_ratio() < min_score or matcher.quick_ratio() < min_score:
+                continue
+            score = matcher.ratio()
+            if score >= min_score:
+                scored.append((score, position))
+        scored.sort(key=lambda item: -item[0])
+        return [(self.names[position], round(score, 3), self.ratings[position])
+                for score, position in scored[:limit]]
+
+
+def suggest_candidates(unmatched: Counter, name_index: JournalNameIndex,
+                       max_journals: int = MAX_SUGGESTED_JOURNALS) -> Dict[str, list]:
+    """为出现次数最多的若干个未匹配名称推荐候选
+
+    Returns:
+        未匹配名称 -> [(候选名称, 相似度, 评级)]，没有候选的名称不出现
+    """
+    suggestions = {}
+    for name, _ in unmatched.most_common(max_journals):
+        if not name:
+            continue
+        candidates = name_index.suggest(name)
+        if candidates:
+            suggestions[name] = candidates
+    return suggestions
+
+
+def write_unmatched_report(path: str, unmatched: Counter, suggestions: Dict[str, list]):
+    """写出未匹配期刊报告（CSV，utf-8-sig）
+
+    每个未匹配名称一行，按出现次数排列；有候选时每个候选一行，
+    可据此修正评级文件或添加别名。
+    """
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['journal', 'count', 'candidate', 'similarity', 'ratings'])
+        for name, count in unmatched.most_common():
+            candidates = suggestions.get(name)
+            if not candidates:
+                writer.writerow([name, count, '', '', ''])
+                continue
+            for candidate, score, ratings in candidates:
+                writer.writerow([name, count, candidate, f'{score:.3f}', format_ratings(ratings)])
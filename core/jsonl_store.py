@@ -0,0 +1,115 @@
+import json
+import os
+from typing import Iterator, List
+
+from utils.atomic_io import AtomicWriteBatch
+
+from .progress import as_reporter
+from .ris_entry import DERIVED_TAGS, RisEntry
+
+JSONL_SUFFIX = '.jsonl'
+
+# 导出全部条目时，超过该数量按分片写出
+JSONL_SHARD_ENTRIES = 100000
+
+
+def is_jsonl(file_path: str) -> bool:
+    """是否为 JSON Lines 格式的条目文件"""
+    return file_path.lower().endswith(JSONL_SUFFIX)
+
+
+def shard_path(path: str, index: int) -> str:
+    """第 index 个分片的文件名：corpus.jsonl -> corpus-00000.jsonl"""
+    stem, suffix = os.path.splitext(path)
+    return f'{stem}-{index:05d}{suffix or JSONL_SUFFIX}'
+
+
+def entry_to_json(entry) -> str:
+    """把条目转换为一行JSON：tag -> 值列表，按标签顺序，包含评级(C2)和翻译(C1、AB)，空的派生标签省略"""
+    return json.dumps({tag: list(values) for tag, values in entry.items() if values},
+                      ensure_ascii=False)
+
+
+def entry_from_json(line: str, keep_ratings: bool = True) -> RisEntry:
+    """从一行JSON恢复条目
+
+    Args:
+        line: entry_to_json 生成的一行
+        keep_ratings: 是否保留C2中的评级；重新处理时应丢弃，由评级阶段重新生成
+    """
+    fields = json.loads(line)
+    entry = RisEntry(fields)
+    # RisEntry 构造时不保留派生标签，单独写回
+    for tag in DERIVED_TAGS:
+        if fields.get(tag) and (keep_ratings or tag != 'C2'):
+            entry[tag] = list(fields[tag])
+    return entry
+
+
+def dump_jsonl(entries, path: str, shard_size: int = None, batch: AtomicWriteBatch = None,
+               progress=None) -> List[str]:
+    """逐条写出 JSON Lines，每行一个条目
+
+    Args:
+        entries: 条目（可以是生成器，不需要事先放入内存）
+        path: 输出文件路径
+        shard_size: 每个分片的条目数；为空时写出单个文件，否则写出 corpus-00000.jsonl 等分片，
+            每个分片可以单独加载和处理
+        batch: AtomicWriteBatch（可选），由调用方统一提交；为空时写完后立即提交
+        progress: 进度回调或 ProgressReporter（可选），每写出一个条目 advance 一次
+    Returns:
+        写出的文件路径列表
+    """
+    if batch is None:
+        with AtomicWriteBatch() as batch:
+            return dump_jsonl(entries, path, shard_size, batch, progress)
+
+    reporter = as_reporter(progress)
+    paths = []
+    handle = None
+    count = 0
+    try:
+        for entry in entries:
+            if handle is None or (shard_size and count == shard_size):
+                if handle is not None:
+                    handle.close()
+                target = shard_path(path, len(paths)) if shard_size else path
+                handle = open(batch.temp_path(target), 'w', encoding='utf-8', newline='\n')
+                paths.append(target)
+                count = 0
+            handle.write(entry_to_json(entry))
+            handle.write('\n')
+            count += 1
+            reporter.advance()
+        if handle is None:
+            # 没有条目时也写出一个空文件
+            target = shard_path(path, 0) if shard_size else path
+            open(batch.temp_path(target), 'w').close()
+            paths.append(target)
+    finally:
+        if handle is not None:
+            handle.close()
+    return paths
+
+
+def iter_jsonl(path: str, keep_ratings: bool = True) -> Iterator[RisEntry]:
+    """逐行读取 JSON Lines 文件中的条目，空行忽略"""
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        for line in f:
+            if line.strip():
+                yield entry_from_json(line, keep_ratings)
+
+
+def load_jsonl(paths, keep_ratings: bool = True) -> List[RisEntry]:
+    """读取一个或多个（分片）JSON Lines 文件中的全部条目
+
+    Args:
+        paths: 文件路径或路径列表，按顺序合并
+        keep_ratings: 是否保留C2中的评级
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    entries = []
+    for path in paths:
+        entries.extend(iter_jsonl(path, keep_ratings))
+    return entries
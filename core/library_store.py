@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Optional
+
+from .dedup import entry_doi, title_year_key
+from .ris_entry import DERIVED_TAGS
+
+# 单次 SQL 查询的最大参数个数
+_QUERY_CHUNK = 500
+
+
+def library_key(entry) -> str:
+    """文献库主键：优先用DOI，其次用 标题+年份，都没有时用内容指纹"""
+    doi = entry_doi(entry)
+    if doi:
+        return f'doi:{doi}'
+    title_key = title_year_key(entry)
+    if title_key:
+        return f'title:{title_key}'
+    return f'hash:{content_hash(entry)}'
+
+
+def source_fields(entry) -> Dict[str, List[str]]:
+    """条目的原始字段（去掉派生标签和已追加的摘要翻译）"""
+    fields = {tag: list(values) for tag, values in entry.items() if tag not in DERIVED_TAGS}
+    if len(fields.get('AB', ())) > 1:
+        fields['AB'] = fields['AB'][:1]
+    return fields
+
+
+def content_hash(entry) -> str:
+    """条目原始内容的指纹，用于判断条目是否发生变化"""
+    text = json.dumps(source_fields(entry), ensure_ascii=False, sort_keys=True)
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class LibraryStore:
+    """基于 SQLite 的跨运行文献库
+
+    按 DOI / 标题指纹保存解析后的条目、评级结果和翻译。再次处理累积导出时，
+    内容未变化的条目直接复用库中的评级和翻译，只有新增或修改的条目需要
+    重新评级和翻译。
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Args:
+            db_path: SQLite 数据库文件路径，不存在时自动创建
+        """
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            ' key TEXT PRIMARY KEY,'
+            ' content_hash TEXT NOT NULL,'
+            ' entry_json TEXT NOT NULL,'
+            ' ratings_json TEXT,'
+            ' rating_fingerprint TEXT,'
+            ' translation_json TEXT,'
+            ' updated_at REAL'
+            ')'
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def lookup(self, keys: Iterable[str]) -> Dict[str, dict]:
+        """批量查询已保存的条目
+
+        Returns:
+            key -> {'content_hash', 'ratings', 'rating_fingerprint', 'translation'}
+        """
+        keys = list(dict.fromkeys(keys))
+        rows = {}
+        for start in range(0, len(keys), _QUERY_CHUNK):
+            chunk = keys[start:start + _QUERY_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            cursor = self.conn.execute(
+                'SELECT key, content_hash, ratings_json, rating_fingerprint, translation_json '
+                f'FROM entries WHERE key IN ({placeholders})', chunk)
+            for key, digest, ratings_json, fingerprint, translation_json in cursor:
+                rows[key] = {
+                    'content_hash': digest,
+                    'ratings': json.loads(ratings_json) if ratings_json else None,
+                    'rating_fingerprint': fingerprint,
+                    'translation': json.loads(translation_json) if translation_json else {},
+                }
+        return rows
+
+    def save(self, records: Iterable[tuple]):
+        """批量写入或更新条目，在一个事务中完成
+
+        Args:
+            records: (key, content_hash, 条目, 评级字典, 评级指纹, 翻译字典) 的序列
+        """
+        now = time.time()
+        self.conn.executemany(
+            'INSERT OR REPLACE INTO entries '
+            '(key, content_hash, entry_json, ratings_json, rating_fingerprint, translation_json, updated_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (
+                (key, digest,
+                 json.dumps(source_fields(entry), ensure_ascii=False),
+                 json.dumps(ratings, ensure_ascii=False) if ratings is not None else None,
+                 fingerprint,
+                 json.dumps(translation, ensure_ascii=False) if translation else None,
+                 now)
+                for key, digest, entry, ratings, fingerprint, translation in records
+            )
+        )
+        self.conn.commit()
+
+    def count(self) -> int:
+        return self.conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+
+
+def entry_translation(entry) -> dict:
+    """取出条目中的翻译结果：标题翻译(C1)和追加在AB之后的摘要翻译"""
+    translation = {}
+    if entry.get('C1'):
+        translation['C1'] = list(entry['C1'])
+    if len(entry.get('AB', ())) > 1:
+        translation['AB'] = list(entry['AB'][1:])
+    return translation
+
+
+def restore_translation(entry, translation: dict):
+    """把库中保存的翻译写回条目"""
+    if translation.get('C1') and not entry.get('C1'):
+        entry['C1'] = list(translation['C1'])
+    if translation.get('AB') and len(entry.get('AB', ())) == 1:
+        entry['AB'] = list(entry['AB']) + list(translation['AB'])
+
+
+class StoredRatingResolver:
+    """先使用文献库中的评级，没有或已过期时交给实际的解析器"""
+
+    def __init__(self, resolver, known: Dict[int, dict]):
+        """
+        Args:
+            resolver: 实际的评级解析器（JournalResolver）
+            known: id(条目) -> 库中保存的评级
+        """
+        self.resolver = resolver
+        self.known = known
+        self.resolved: Dict[int, dict] = {}
+
+    def resolve_entry(self, entry) -> dict:
+        ratings = self.known.get(id(entry))
+        if ratings is None:
+            ratings = self.resolver.resolve_entry(entry)
+        self.resolved[id(entry)] = ratings
+        return ratings
+
+    def ratings_for(self, entry) -> Optional[dict]:
+        return self.resolved.get(id(entry))
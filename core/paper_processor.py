@@ -3,6 +3,8 @@ import json
 import sys
 import os
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 # 添加项目根目录到Python路径
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -12,68 +14,227 @@ sys.path.append(project_root)
 from utils.translator import *
 from core.data_manager import DataManager
 from core.data_types import RatingSystem
+from core.library_store import (LibraryStore, StoredRatingResolver, content_hash,
+                                entry_translation, library_key, restore_translation)
+from core.dedup import (DuplicateIndex, entry_doi, merge_entries, resolve_near_duplicates,
+                        stream_deduplicate, title_year_key)
+from core.cancellation import CancellationToken, ProcessingCancelled
+from core.progress import as_reporter
+from core.ris_entry import RisEntry
+from core.ris_writer import format_ris_entry, write_outputs
+from core.bibtex_writer import CitationKeyRegistry, bibtex_formatter
+from core.table_writer import TABLE_FORMATS, write_tables
+from core.jsonl_store import JSONL_SHARD_ENTRIES, dump_jsonl, is_jsonl, load_jsonl
+from core.summary import SUMMARY_FILE_NAME, RunSummary
+from core.journal_suggest import (UNMATCHED_FILE_NAME, JournalNameIndex, suggest_candidates,
+                                  write_unmatched_report)
+from core.ris_reader import (RisIndex, is_archive, iter_archive_members, read_ris_text,
+                             record_fields)
+from core.rating_index import (NOT_FOUND, JournalResolver, RatingIndex, load_identifier_mapping,
+                               rating_data_fingerprint)
+from utils.atomic_io import AtomicWriteBatch
 
 #%%
 
-def parse_ris(content):
-    """解析RIS文件内容，返回条目列表"""
+# 支持的输出格式：RIS、BibTeX、结果表格（csv / parquet）和全部条目的 JSON Lines
+OUTPUT_FORMATS = ('ris', 'bib') + TABLE_FORMATS + ('jsonl',)
+
+# JSON Lines 输出的文件名
+JSONL_FILE_NAME = 'corpus.jsonl'
+
+# 超过该大小的输入文件默认使用流式去重
+STREAMING_DEDUP_MIN_BYTES = 256 * 1024 * 1024
+
+# 超过该长度（字符数）的内容使用多进程并行解析，较小的内容串行解析以免进程池的启动开销
+PARALLEL_PARSE_MIN_CHARS = 64 * 1024 * 1024
+
+def parse_ris(content, workers=None):
+    """解析RIS文件内容，返回条目列表（RisEntry，用法与 tag -> list 字典相同）
+
+    内容超过 PARALLEL_PARSE_MIN_CHARS 时按记录边界切块，在进程池中并行解析，
+    条目保持原有顺序。
+    
+    参数:
+        content: RIS文件内容
+        workers: 并行解析的进程数，默认为CPU核心数；为1时总是串行解析
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers < 2 or len(content) < PARALLEL_PARSE_MIN_CHARS:
+        return _parse_ris_serial(content)
+    chunks = split_ris_chunks(content, workers)
+    if len(chunks) < 2:
+        return _parse_ris_serial(content)
+    try:
+        with ProcessPoolExecutor(min(workers, len(chunks))) as pool:
+            # 子进程只传回 (标签, 值) 状态，比传回条目对象的反序列化快一倍
+            return [RisEntry.from_state(state)
+                    for states in pool.map(_parse_ris_states, chunks) for state in states]
+    except (OSError, BrokenProcessPool) as e:
+        print(f"并行解析失败，改为串行解析: {str(e)}")
+        return _parse_ris_serial(content)
+
+
+def split_ris_chunks(content, count):
+    """在 ER 行之后把RIS内容切成大致相等的 count 块"""
+    size = max(len(content) // count, 1)
+    chunks = []
+    start = 0
+    pos = size
+    while start < len(content):
+        found = content.find('\nER  -', pos)
+        if found < 0:
+            break
+        line_end = content.find('\n', found + 1)
+        line_end = len(content) if line_end < 0 else line_end + 1
+        pos = found + 1
+        if content[found + 6:line_end].strip():
+            continue
+        chunks.append(content[start:line_end])
+        start = line_end
+        pos = start + size
+    if start < len(content):
+        chunks.append(content[start:])
+    return chunks
+
+
+def _parse_ris_states(content):
+    """进程池中解析一块内容"""
+    return [entry.state() for entry in _parse_ris_serial(content)]
+
+
+def _parse_ris_serial(content):
+    """串行解析RIS内容
+
+    逐行的状态机：'XX  - 值' 开始一个新字段；不符合标签格式的非空行是上一个
+    字段的续行（EndNote、知网导出的长摘要），以换行符接在上一个值之后；
+    没有值的标签行等待续行作为它的值，没有续行时忽略。
+    """
     entries = []
     current_entry = defaultdict(list)
+    values = None  # 最近一个字段的值列表
+    pending = None  # 还没有值的标签
     
     for line in content.split('\n'):
-        line = line.strip()
-        if not line:
+        if line[2:5] != '  -' or not line[:2].isupper():
+            # 空行、续行或缩进的标签行，只有这些行需要 strip
+            stripped = line.strip()
+            if not stripped:
+                continue
+            if stripped[2:5] != '  -' or not stripped[:2].isupper():
+                if pending:
+                    values = current_entry[pending]
+                    values.append(stripped)
+                    pending = None
+                elif values:
+                    values[-1] += '\n' + stripped
+                continue
+            line = stripped
+
+        tag = line[:2]
+        value = line[6:].strip()
+        if not value:
+            values = None
+            if tag == 'ER':
+                pending = None
+                if current_entry:
+                    entries.append(RisEntry(current_entry))
+                    current_entry = defaultdict(list)
+            else:
+                pending = tag
             continue
-            
-        if line == 'ER  -':
-            if current_entry:
-                current_entry['C1'] = []
-                current_entry['C2'] = []
-                current_entry['LB'] = []
-                entries.append(dict(current_entry))
-                current_entry = defaultdict(list)
-        elif len(line) > 6:
-            tag = line[:2]
-            value = line[6:].strip()
-            current_entry[tag].append(value)
+        values = current_entry[tag]
+        values.append(value)
+        pending = None
     
     if current_entry:
-        current_entry['C1'] = []
-        current_entry['C2'] = []
-        current_entry['LB'] = []
-        entries.append(dict(current_entry))
+        entries.append(RisEntry(current_entry))
     
     return entries
 
-def deduplicate_entries(entries):
+def deduplicate_entries(entries, stats=None):
     """对文献条目进行去重
+
+    以规范化DOI为主键，没有DOI时使用 规范化标题 + 年份，见 DuplicateIndex。
+    没有DOI也没有标题的条目无法判断，原样保留。重复条目在同一遍扫描中
+    合并（见 merge_entries），不会丢失只存在于某一份中的关键词、DOI、摘要等。
     
     参数:
         entries: RIS条目列表
+        stats: 可选的字典，写入各规则删除的重复条目数 {'doi': n, 'title': n}
     
     返回:
         list: 去重后的条目列表
     """
-    # 使用标题作为唯一标识
-    unique_entries = {}
+    index = DuplicateIndex()
+    unique_entries = []
     for entry in entries:
-        # 获取标题,如果没有标题则跳过
-        if 'TI' not in entry or not entry['TI']:
-            continue
-            
-        title = entry['TI'][0].lower()  # 转小写以忽略大小写差异
-        
-        if title not in unique_entries:
-            unique_entries[title] = entry
+        doi_key = entry_doi(entry)
+        title_key = title_year_key(entry)
+        slot, rule = index.match(doi_key, title_key)
+        if slot is None:
+            index.add(doi_key, title_key)
+            unique_entries.append(entry)
         else:
-            # 如果已存在该标题,保留更完整的条目
-            existing = unique_entries[title]
+            index.record_duplicate(slot, rule, doi_key)
+            # 以更完整的条目为主，合并另一份中的信息
+            existing = unique_entries[slot]
             if len(entry) > len(existing):
-                unique_entries[title] = entry
+                unique_entries[slot] = merge_entries(entry, existing)
+            else:
+                merge_entries(existing, entry)
     
-    return list(unique_entries.values())
+    if stats is not None:
+        stats.update(index.removed)
+    return unique_entries
+
+
 
 
+def resolve_lazy_records(records, ris_index, resolver, selection_criteria, reporter=None,
+                         summary=None):
+    """延迟解析只保存了偏移的记录
+
+    先只解码期刊名称、ISSN、DOI 几个字段解析评级，只有可能被输出（有评级，
+    或评级满足某个选择标准）的记录才完整解析，其余记录不会被解码成条目。
+    
+    参数:
+        records: 条目或 (偏移, 长度) 的列表
+        ris_index: 记录所在文件的 RisIndex
+        resolver: 期刊评级解析器 JournalResolver
+        selection_criteria: 选择标准
+        reporter: 进度汇报 ProgressReporter（可选），汇报 'parse' 阶段
+        summary: RunSummary（可选），被跳过的记录在这里计入统计（其余记录在评级阶段计入）
+    
+    返回:
+        (条目列表, id(条目) -> 已解析的评级)
+    """
+    reporter = as_reporter(reporter)
+    tags = resolver.journal_tags + ['SN', 'DO']
+    wanted = {}
+    for criteria_dict in selection_criteria.values():
+        for system, ratings in criteria_dict.items():
+            wanted.setdefault(system, set()).update(ratings)
+
+    entries = []
+    known_ratings = {}
+    reporter.start('parse', len(records))
+    for record in records:
+        reporter.advance()
+        if not isinstance(record, tuple):
+            entries.append(record)
+            continue
+        raw = ris_index.read(*record)
+        fields = RisEntry(record_fields(raw, tags, ris_index.encoding))
+        ratings = resolver.resolve_entry(fields)
+        if not any(rating != NOT_FOUND or rating in wanted.get(system, ())
+                   for system, rating in ratings.items()):
+            if summary is not None:
+                summary.add(fields, ratings)
+            continue
+        for entry in parse_ris(ris_index.decode(raw)):
+            known_ratings[id(entry)] = ratings
+            entries.append(entry)
+    return entries, known_ratings
 
 
 def load_rating_data(path_rating_file):
@@ -95,19 +256,11 @@ def get_journal_rating(journal_name, rating_data, json_attribute_title, json_att
         rating_data: 评级数据
         json_attribute_title: 评价文件json中 期刊名称对应的 key
         json_attribute_rating: 评价文件json中 期刊评级对应的 key
+
+    每次调用都会编译一次评级索引；批量查询时应直接构建 RatingIndex 并调用其 resolve。
     """
-    ratings = {}
-    for system, data in rating_data.items():
-        for criteria_paper_item in data:
-            if criteria_paper_item[json_attribute_title[system]].lower() == journal_name.lower():
-                if system == 'CCF':# ccf 期刊和会议分开
-                    ratings[system] = criteria_paper_item.get(json_attribute_rating[system]) + criteria_paper_item.get('type')
-                else:
-                    ratings[system] = criteria_paper_item.get(json_attribute_rating[system])
-                break
-            else:
-                ratings[system] = 'Not Found' # 如果未找到评级，则返回'Not Found'
-    return ratings
+    rating_index = RatingIndex(rating_data, json_attribute_title, json_attribute_rating)
+    return rating_index.resolve((journal_name,))
 
 
 
@@ -115,7 +268,8 @@ def get_paper_criteria(entries,
                     json_attribute_title, json_attribute_rating, 
                     rating_data, selection_criteria, 
                     balancer, trans_ti=True, trans_ab=True, 
-                    progress_callback=None):
+                    progress_callback=None, resolver=None, cancel_token=None,
+                    key_registry=None, summary=None):
     """
     根据不同标准对文献进行分类
     
@@ -128,24 +282,40 @@ def get_paper_criteria(entries,
         balancer: 翻译器
         trans_ti: 是否翻译标题
         trans_ab: 是否翻译摘要
-        progress_callback: 进度回调函数
+        progress_callback: 进度回调函数 callback(阶段, 当前, 总数) 或 ProgressReporter，
+            汇报 'rate' 和 'translate' 两个阶段
+        resolver: 期刊评级解析器 JournalResolver，为空时根据 rating_data 构建
+        cancel_token: 取消令牌（可选），每条翻译之前检查；取消时停止翻译，
+            返回已完成的分类结果，由调用方决定是否保留
+        key_registry: citation key 登记表 CitationKeyRegistry（可选），写入LB的 key
+            在其中登记，保证同一次运行中不重复
+        summary: RunSummary（可选），评级的同时累积各等级的条目数和未匹配的期刊
     """
+    reporter = as_reporter(progress_callback)
+    # 空的登记表长度为0，不能用 or 判断
+    if key_registry is None:
+        key_registry = CitationKeyRegistry()
+    if resolver is None:
+        resolver = JournalResolver(
+            RatingIndex(rating_data, json_attribute_title, json_attribute_rating))
+    
+    # 每个条目只解析一次评级，各分类标准共用
+    reporter.start('rate', len(entries))
+    entry_ratings = []
+    for entry in entries:
+        ratings = resolver.resolve_entry(entry)
+        entry_ratings.append(ratings)
+        if summary is not None:
+            summary.add(entry, ratings)
+        reporter.advance()
     
-    # 记录已处理的条目数
-    processed_entries = 0
-    total_entries = len(entries)
     selected_criteria_entries = {criteria: [] for criteria in selection_criteria}
+    # 被任一标准选中的条目，按第一次被选中的顺序
+    selected_entries = {}
     round = 1
     for criteria in selected_criteria_entries.keys(): # 遍历选择标准
         criteria_dict = selection_criteria[criteria] # 获取criteria对应的评级标准
-        init_length = len(selected_criteria_entries[criteria])
-        for entry in entries: # 遍历文献条目
-            if 'T2' not in entry: # 如果没有T2，跳过此条目
-                continue
-            
-            T2 = entry['T2'][0] # 获取journal 标题
-            ratings = get_journal_rating(T2, rating_data, json_attribute_title, json_attribute_rating)
-            
+        for entry, ratings in zip(entries, entry_ratings): # 遍历文献条目
             if not ratings:  # 如果ratings为None或空，跳过此条目
                 continue
 
@@ -157,6 +327,7 @@ def get_paper_criteria(entries,
                 if system in criteria_dict.keys(): 
                     if rating in criteria_dict[system]:
                         selected_criteria_entries[criteria].append(entry)
+                        selected_entries.setdefault(id(entry), entry)
 
                 # if system in criteria_dict.keys():  # 一般情况
                 #     if criteria == '1A' and 'TOP' in entry['C1']:
@@ -173,56 +344,52 @@ def get_paper_criteria(entries,
                 #     if rating[1::] == '期刊' and rating[0] == 'B':
                 #         selected_entries[criteria].append(entry)
             
-            # 只翻译 被 选中 的 条目，以及生成标签作为 bibtex的 citation_key
-            if len(selected_criteria_entries[criteria]) != init_length:
-                if entry['LB'] == []:
-                    title = entry['TI'][0].split(' ')
-                    for i in title:
-                        # 去掉单词末尾的标点符号
-                        word = i.strip('.,;:!?()[]{}"\'-')  # 去掉常见的标点符号
-                        if (word.lower() not in ["a", "the", "an", "and", "or", "but", "if", 
-                            "because", "as", "until", "while", "by"] and word):  # 确保word不为空
-                            entry['LB'].append(entry['AU'][0].split(',')[0] + entry['PY'][0] + word)
-                            break
-
-                resultTi = None  # 初始化变量
-                resultAb = None  # 初始化变量
-
-                if trans_ti and 'TI' in entry and entry['C1'] == []:
-                    try:
-                        resultTi = translate_text(
-                            text=entry['TI'][0],
-                            source_lang="auto",
-                            target_lang="ZH",
-                            load_balancer=balancer
-                        )
-                    except Exception as e:
-                        print(f"翻译标题出错: {str(e)}")
-
-                if trans_ab and 'AB' in entry:
-                    try:
-                        resultAb = translate_text(
-                            text=entry['AB'][0],
-                            source_lang="auto",
-                            target_lang="ZH",
-                            load_balancer=balancer
-                        )
-                    except Exception as e:
-                        print(f"翻译摘要出错: {str(e)}")
-                
-                if resultTi:
-                    main_text = resultTi[0]
-                    entry['C1'].append(main_text)
-                if resultAb:
-                    main_text = resultAb[0]
-                    entry['AB'].append(main_text)
-                init_length = len(selected_criteria_entries[criteria])
-            
-            # 更新进度
-            processed_entries += 1
-            if progress_callback:
-                progress_callback(processed_entries, total_entries)
         round += 1
+
+    # 只翻译 被 选中 的 条目，以及生成标签作为 bibtex的 citation_key
+    translate = trans_ti or trans_ab
+    if translate:
+        reporter.start('translate', len(selected_entries))
+    for entry in selected_entries.values():
+        if cancel_token is not None and cancel_token.wait():
+            break
+        if entry['LB'] == [] and entry.get('TI') and entry.get('AU') and entry.get('PY'):
+            # 第一作者姓 + 年份 + 标题第一个非停用词，重复时追加 a, b, c
+            entry['LB'].append(key_registry.key_for(entry))
+
+        resultTi = None  # 初始化变量
+        resultAb = None  # 初始化变量
+
+        if trans_ti and 'TI' in entry and entry['C1'] == []:
+            try:
+                resultTi = translate_text(
+                    text=entry['TI'][0],
+                    source_lang="auto",
+                    target_lang="ZH",
+                    load_balancer=balancer
+                )
+            except Exception as e:
+                print(f"翻译标题出错: {str(e)}")
+
+        if trans_ab and 'AB' in entry and len(entry['AB']) == 1:  # 已有摘要翻译时跳过
+            try:
+                resultAb = translate_text(
+                    text=entry['AB'][0],
+                    source_lang="auto",
+                    target_lang="ZH",
+                    load_balancer=balancer
+                )
+            except Exception as e:
+                print(f"翻译摘要出错: {str(e)}")
+        
+        if resultTi:
+            main_text = resultTi[0]
+            entry['C1'].append(main_text)
+        if resultAb:
+            main_text = resultAb[0]
+            entry['AB'] = list(entry['AB']) + [main_text]
+        if translate:
+            reporter.advance()
     return selected_criteria_entries
 
 def get_paper_criteria_profile(entries, selection_profile):
@@ -259,35 +426,21 @@ def get_paper_criteria_profile(entries, selection_profile):
 #%%
 def to_ris(entries):
     """将多个条目转换为RIS格式字符串"""
-    all_ris_lines = []
-    
-    # 遍历所有条目
-    for entry in entries:
-        # 遍历当前条目中的所有标签和值
-        for tag, values in entry.items():
-            c2 = ''
-            if tag == 'C2':
-                for value in values:
-                    c2 += value + ' '
-                all_ris_lines.append(f"{tag}  - {c2}")
-            else:
-                for value in values:
-                    all_ris_lines.append(f"{tag}  - {value}")
-        
-        # 每个条目后添加结束标记和空行
-        all_ris_lines.append("ER  -")
-        all_ris_lines.append("")
-    
-    # 用换行符连接所有行
-    return "\n".join(all_ris_lines)
+    # 每个条目以 ER 行和空行结尾，条目之间用换行符连接
+    return "\n".join(format_ris_entry(entry) for entry in entries)
 
 
 def process_ris_file(file_path, selection_criteria, selection_profile, 
                     path_rating_file, json_attribute_title, json_attribute_rating, output_directory='out_ris',
                     trans_ti=False, trans_ab=False, tokenMissuo=None, tokenLinuxdo=None,
-                    progress_callback=None):
+                    progress_callback=None, json_attribute_issn=None, path_identifier_file=None,
+                    json_attribute_abbr=None, journal_tags=None, resolution_cache_path=None,
+                    streaming_dedup=None, near_duplicates=None, library_path=None,
+                    cancel_token=None, output_formats=None, journal_aliases=None):
     """处理RIS文件并分析期刊评级
-    file_path: 输入的RIS文件路径        
+    file_path: 输入的RIS文件路径，也可以是 .zip / .gz / .tar.gz 压缩包（其中每个RIS文件
+            在内存中解压、单独解析后合并处理），或之前输出的 .jsonl 文件/分片（跳过RIS解析，
+            保留其中的翻译，评级重新计算）
     selection_criteria: 选择的标准
     path_rating_file: 评级数据文件路径
     json_attribute_title: 评价文件json中 期刊名称对应的 key
@@ -297,36 +450,176 @@ def process_ris_file(file_path, selection_criteria, selection_profile,
     trans_ab: 是否翻译摘要
     tokenMissuo: 免费翻译服务的token
     tokenLinuxdo: 付费翻译服务的token
-    progress_callback: 进度回调函数，接收两个参数：
-            - current: 当前处理的条目数
-            - total: 总条目数
+    progress_callback: 进度回调函数，接收三个参数（更新频率已合并，见 ProgressReporter）：
+            - stage: 当前阶段 'parse' / 'dedup' / 'rate' / 'translate' / 'write'
+            - current: 当前阶段已完成的数量
+            - total: 当前阶段的总数，0 表示总数未知
+    json_attribute_issn: 评价文件json中 ISSN对应的 key（可选）
+    path_identifier_file: 补充的 ISSN / DOI前缀 -> 期刊名称 映射文件（可选）
+    json_attribute_abbr: 评价文件json中 期刊/会议缩写对应的 key（可选）
+    journal_tags: 依次尝试的期刊名称标签，默认 T2, JO, JF, J2, BT
+    resolution_cache_path: 跨运行的期刊解析缓存文件（可选），评级文件或配置变化时自动失效
+    streaming_dedup: 是否使用流式去重（按 标题+年份+第一作者 指纹），适合超大文件，
+            文件通过 mmap 建立偏移索引，只有有评级的记录会被完整解析（见 resolve_lazy_records）；
+            为None时文件超过 STREAMING_DEDUP_MIN_BYTES 自动启用
+    near_duplicates: 近似重复处理方式（MinHash/LSH，基于标题和摘要）：
+            'merge' 合并为一条，'flag' 在C3中标记簇编号，None 不处理
+    library_path: 跨运行文献库(SQLite)路径（可选），内容未变化的条目复用已保存的评级和翻译
+    cancel_token: 取消令牌 CancellationToken（可选），在各阶段之间和每条翻译之间检查；
+            取消时抛出 ProcessingCancelled，令牌的 keep_partial 为True时先写出已完成的部分结果；
+            分类完成之前取消时没有部分结果，异常的 partial_written 为False
+    output_formats: 输出格式列表，取值见 OUTPUT_FORMATS，默认只输出 'ris'；
+            'bib' 为每个分类额外写出同名的 .bib 文件，citation key 在整次运行中不重复；
+            'csv' / 'parquet' 写出 results.csv / results.parquet，每个条目一行（未评级的条目评级列为空），
+            每个评级系统和每个分类各一列（parquet 需要安装 pyarrow）；
+            'jsonl' 写出 corpus.jsonl，每行一个条目（含评级和翻译），超过 JSONL_SHARD_ENTRIES
+            条时写为 corpus-00000.jsonl 等分片，可作为下次处理的输入
+    journal_aliases: 期刊名称别名 -> 规范名称（可选，见 DataManager.get_journal_aliases），
+            构建评级索引时并入，对所有评级系统生效
+    
+    返回:
+        RunSummary：各评级系统的等级分布、未匹配的期刊（附评级文件中相似的候选名称）和各分类的
+        条目数，同时以文本形式写入输出文件夹中的 summary.txt；未匹配的期刊及全部候选另外写入
+        unmatched_journals.csv
     """
+    cancel_token = cancel_token or CancellationToken()
+    output_formats = output_formats or ('ris',)
     try:
-        # 读取RIS文件
-        with open(file_path, 'r', encoding='utf-8-sig') as f:
-            ris_content = f.read()
-            
-        # 解析RIS内容
-        entries = parse_ris(ris_content)
-        entries = deduplicate_entries(entries)
+        reporter = as_reporter(progress_callback)
+        summary = RunSummary(journal_tags)
+        archive = is_archive(file_path)
+        jsonl = is_jsonl(file_path)
+        if streaming_dedup is None:
+            streaming_dedup = os.path.getsize(file_path) >= STREAMING_DEDUP_MIN_BYTES
+        # 流式去重依赖RIS文件偏移，压缩包和 JSON Lines 只能在内存中处理
+        streaming_dedup = streaming_dedup and not archive and not jsonl
+        if streaming_dedup:
+            # 流式去重：先只用指纹和偏移去重，再读取保留下来的记录
+            reporter.start('dedup')
+            # 同一个索引先用于去重，再用于按偏移读取记录，文件只扫描一次
+            ris_index = RisIndex(file_path)
+            groups, dedup_stats = stream_deduplicate(ris_index)
+            # 近似重复、文献库、JSON Lines 和表格输出需要完整条目，否则没有重复的记录只保留偏移，
+            # 评级后再按需解析（没有评级的记录会被跳过）
+            lazy = not (near_duplicates or library_path
+                        or any(fmt in output_formats for fmt in ('jsonl',) + TABLE_FORMATS))
+            entries = []
+            for group in groups:
+                if lazy and len(group) == 1:
+                    entries.append(group[0])
+                    continue
+                members = [entry for offset, length in group
+                           for entry in parse_ris(ris_index.decode(ris_index.read(offset, length)))]
+                for other in members[1:]:
+                    merge_entries(members[0], other)
+                entries.extend(members[:1])
+        else:
+            ris_index = None
+            reporter.start('parse')
+            if archive:
+                # 压缩包中的每个RIS文件单独解码、解析
+                entries = []
+                for member_name, member_content in iter_archive_members(file_path):
+                    member_entries = parse_ris(member_content)
+                    print(f'{member_name}: {len(member_entries)} 条目')
+                    entries.extend(member_entries)
+                    reporter.advance()
+            elif jsonl:
+                # 已解析的条目，丢弃旧的评级，由评级阶段重新生成
+                entries = load_jsonl(file_path, keep_ratings=False)
+            else:
+                # 读取RIS文件（自动识别 UTF-8 / UTF-16 / GBK 编码）
+                ris_content = read_ris_text(file_path)
+                    
+                # 解析RIS内容
+                entries = parse_ris(ris_content)
+            dedup_stats = {}
+            reporter.start('dedup', len(entries))
+            entries = deduplicate_entries(entries, dedup_stats)
+        print(f"去重删除条目: DOI {dedup_stats['doi']}, 标题+年份 {dedup_stats['title']}")
+        summary.duplicates = dedup_stats
+        cancel_token.check()
+        if near_duplicates:
+            entries, clusters = resolve_near_duplicates(entries, near_duplicates)
+            print(f'近似重复簇数量: {clusters}')
         total_entries = len(entries)
         print(f'条目数量: {total_entries}')
         
+        cancel_token.check()
+        
         # 加载评级数据
         rating_data = load_rating_data(path_rating_file)
         
-        # 为每个选择标准创建空列表
-        
+        # 编译评级索引：ISSN -> 规范化名称 -> 宽松名称 -> 会议缩写 -> DOI前缀
+        rating_index = RatingIndex(rating_data, json_attribute_title, json_attribute_rating,
+                                   json_attribute_issn=json_attribute_issn,
+                                   identifier_mapping=load_identifier_mapping(path_identifier_file),
+                                   json_attribute_abbr=json_attribute_abbr,
+                                   aliases=journal_aliases)
+        fingerprint = rating_data_fingerprint(
+            list(path_rating_file.values()) + [path_identifier_file],
+            json_attribute_title, json_attribute_rating, json_attribute_issn,
+            json_attribute_abbr, journal_tags, journal_aliases or {})
+        resolver = JournalResolver(rating_index, journal_tags,
+                                   cache_path=resolution_cache_path, fingerprint=fingerprint)
+
+        entry_resolver = resolver
+        if ris_index is not None:
+            entries, known_ratings = resolve_lazy_records(entries, ris_index, resolver,
+                                                          selection_criteria, reporter, summary)
+            ris_index.close()
+            print(f'需要完整解析的条目: {len(entries)}')
+            entry_resolver = StoredRatingResolver(resolver, known_ratings)
+            cancel_token.check()
+
+        # 文献库：内容未变化的条目复用库中的评级和翻译
+        store = LibraryStore(library_path) if library_path else None
+        if store:
+            library_keys = [library_key(entry) for entry in entries]
+            content_hashes = [content_hash(entry) for entry in entries]
+            rows = store.lookup(library_keys)
+            known_ratings = {}
+            for entry, key, digest in zip(entries, library_keys, content_hashes):
+                row = rows.get(key)
+                if row and row['content_hash'] == digest:
+                    restore_translation(entry, row['translation'])
+                    if row['ratings'] is not None and row['rating_fingerprint'] == fingerprint:
+                        known_ratings[id(entry)] = row['ratings']
+            print(f'文献库中未变化的条目: {len(known_ratings)}/{len(entries)}')
+            entry_resolver = StoredRatingResolver(resolver, known_ratings)
 
         # 创建翻译器
         balancer = create_default_load_balancer(tokenMissuo, tokenLinuxdo)
+        key_registry = CitationKeyRegistry()
         
         # 基础分类
         after_selected = get_paper_criteria(entries, 
                                     json_attribute_title, json_attribute_rating,
                                     rating_data, selection_criteria,
                                     balancer, trans_ti, trans_ab, 
-                                    progress_callback)
+                                    reporter, entry_resolver, cancel_token, key_registry,
+                                    summary)
+        # 分类之后的步骤很快，只有翻译被中断时才算取消
+        interrupted = cancel_token.cancelled
+        print(f'期刊标签命中统计: {resolver.tag_hits}, 未命中: {resolver.misses}')
+        print(f'期刊解析缓存: 命中 {resolver.memo_hits}, 未命中 {resolver.memo_misses}')
+        resolver.save_cache()
+        if summary.unmatched_journals:
+            # 为未匹配的期刊在所有评级文件的名称中查找相似的候选
+            summary.suggestions = suggest_candidates(
+                summary.unmatched_journals, JournalNameIndex.from_rating_index(rating_index))
+
+        if store:
+            with store:
+                store.save(
+                    (key, digest, entry, entry_resolver.ratings_for(entry), fingerprint,
+                     entry_translation(entry))
+                    for entry, key, digest in zip(entries, library_keys, content_hashes)
+                )
+
+        # 翻译过程中被取消：分类已经完成，按需写出部分结果
+        if interrupted and not cancel_token.keep_partial:
+            raise ProcessingCancelled()
 
         # 处理其他条目
         selected_entries = []
@@ -341,14 +634,12 @@ def process_ris_file(file_path, selection_criteria, selection_profile,
             selected_profile = get_paper_criteria_profile(selected_entries, selection_profile)
 
         #基础分类
+        outputs = {}
         for criteria, selected_entries_criteria in after_selected.items():
             if selected_entries_criteria == []:
                 continue
-            ris_out = to_ris(selected_entries_criteria)
             print(f'{criteria} 条目数量: {len(selected_entries_criteria)}')
-            with open(os.path.join(output_directory, f'{criteria}.ris'),
-                    'w', encoding='utf-8-sig') as f:
-                f.write(ris_out)
+            outputs[criteria] = selected_entries_criteria
                 
         # 二级分类
         if selection_profile:
@@ -356,12 +647,43 @@ def process_ris_file(file_path, selection_criteria, selection_profile,
                 for criteria_set, selected_entries_criteria_set in selected_entries_profile.items():
                     if selected_entries_criteria_set == []:
                         continue
-                    ris_out = to_ris(selected_entries_criteria_set)
                     print(f'{profile}_{criteria_set} 条目数量: {len(selected_entries_criteria_set)}')
-                    with open(os.path.join(output_directory, f'{profile}_{criteria_set}.ris'),
-                        'w', encoding='utf-8-sig') as f:
-                        f.write(ris_out)
-        return True
+                    outputs[f'{profile}_{criteria_set}'] = selected_entries_criteria_set
+
+        summary.outputs = {name: len(members) for name, members in outputs.items()}
+
+        # 每种格式一次遍历写出所有输出文件，每个条目只格式化一次；所有文件一起提交
+        with AtomicWriteBatch() as batch:
+            if 'ris' in output_formats:
+                write_outputs(entries, {f'{name}.ris': members for name, members in outputs.items()},
+                              output_directory, progress=reporter, batch=batch)
+            if 'bib' in output_formats:
+                write_outputs(entries, {f'{name}.bib': members for name, members in outputs.items()},
+                              output_directory, progress=reporter, batch=batch,
+                              formatter=bibtex_formatter(key_registry), bom=False)
+            table_formats = [fmt for fmt in output_formats if fmt in TABLE_FORMATS]
+            if table_formats:
+                write_tables(entries, outputs, list(path_rating_file), output_directory,
+                             table_formats, batch, key_registry, reporter, journal_tags)
+            if 'jsonl' in output_formats:
+                reporter.start('write', len(entries))
+                shard_size = JSONL_SHARD_ENTRIES if len(entries) > JSONL_SHARD_ENTRIES else None
+                dump_jsonl(entries, os.path.join(output_directory, JSONL_FILE_NAME),
+                           shard_size, batch, reporter)
+            summary_path = batch.temp_path(os.path.join(output_directory, SUMMARY_FILE_NAME))
+            with open(summary_path, 'w', encoding='utf-8-sig') as f:
+                f.write(summary.format_text())
+            if summary.unmatched_journals:
+                write_unmatched_report(
+                    batch.temp_path(os.path.join(output_directory, UNMATCHED_FILE_NAME)),
+                    summary.unmatched_journals, summary.suggestions)
+        reporter.finish()
+        if interrupted:
+            raise ProcessingCancelled(partial_written=True)
+        return summary
+    except ProcessingCancelled:
+        print('处理已取消')
+        raise
     except Exception as e:
         print(f"处理过程中出现错误: {str(e)}")
         raise e
@@ -403,6 +725,15 @@ def main():
             system: mapping['paper_name']
             for system, mapping in json_attribute_mapping.items()
         }
+        json_attribute_issn = {
+            system: [mapping[key] for key in ('issn', 'eissn') if key in mapping]
+            for system, mapping in json_attribute_mapping.items()
+        }
+        json_attribute_abbr = {
+            system: mapping['abbr']
+            for system, mapping in json_attribute_mapping.items()
+            if 'abbr' in mapping
+        }
         
         # 获取分类标准
         selection_criteria = data_manager.get_selection_criteria()
@@ -418,7 +749,16 @@ def main():
             path_rating_file=path_rating_file,
             json_attribute_title=json_attribute_title,
             json_attribute_rating=json_attribute_rating,
-            output_directory=output_directory
+            output_directory=output_directory,
+            json_attribute_issn=json_attribute_issn,
+            path_identifier_file=data_manager.config.identifier_file_path,
+            json_attribute_abbr=json_attribute_abbr,
+            journal_tags=data_manager.config.journal_tags,
+            resolution_cache_path=data_manager.get_resolution_cache_path(),
+            near_duplicates=data_manager.config.near_duplicate_mode or None,
+            library_path=data_manager.get_library_path(),
+            output_formats=data_manager.config.output_formats,
+            journal_aliases=data_manager.get_journal_aliases()
         )
         
     except Exception as e:
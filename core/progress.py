@@ -0,0 +1,75 @@
+import time
+
+# 处理阶段 -> 界面显示的名称
+STAGE_NAMES = {
+    'parse': '解析',
+    'dedup': '去重',
+    'rate': '评级',
+    'translate': '翻译',
+    'write': '写出',
+}
+
+
+class ProgressReporter:
+    """按阶段汇报进度，合并高频的进度更新
+
+    回调签名为 callback(阶段, 当前, 总数)，总数为0表示该阶段无法预知总量。
+    advance() 在热循环中只做一次加法和比较，计数到达检查点时才读取时钟，
+    两次回调之间至少间隔 min_interval 秒；阶段开始和结束时总会回调。
+    """
+
+    def __init__(self, callback=None, min_interval: float = 0.1):
+        """
+        Args:
+            callback: 进度回调函数，可以为None
+            min_interval: 两次回调之间的最短间隔（秒）
+        """
+        self.callback = callback
+        self.min_interval = min_interval
+        self.stage = None
+        self.current = 0
+        self.total = 0
+        self._step = 1
+        self._next_check = 1
+        self._last_emit = 0.0
+
+    def start(self, stage: str, total: int = 0):
+        """开始新阶段，上一个阶段未结束时先结束它"""
+        if self.stage is not None:
+            self.finish()
+        self.stage = stage
+        self.current = 0
+        self.total = total
+        # 大约每千分之一的进度检查一次时钟
+        self._step = max(1, total // 1000)
+        self._next_check = self._step
+        self._emit()
+
+    def advance(self, count: int = 1):
+        self.current += count
+        if self.current >= self._next_check:
+            self._next_check = self.current + self._step
+            now = time.monotonic()
+            if now - self._last_emit >= self.min_interval:
+                self._emit(now)
+
+    def finish(self):
+        """结束当前阶段，汇报最终进度"""
+        if self.stage is None:
+            return
+        if self.total:
+            self.current = self.total
+        self._emit()
+        self.stage = None
+
+    def _emit(self, now: float = None):
+        self._last_emit = time.monotonic() if now is None else now
+        if self.callback:
+            self.callback(self.stage, self.current, self.total)
+
+
+def as_reporter(progress) -> ProgressReporter:
+    """把进度回调函数包装为 ProgressReporter，已经是 ProgressReporter 时原样返回"""
+    if isinstance(progress, ProgressReporter):
+        return progress
+    return ProgressReporter(progress)
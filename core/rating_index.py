@@ -0,0 +1,470 @@
+import hashlib
+import json
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+NOT_FOUND = 'Not Found'
+
+# ISSN: 4位数字 + 可选连字符 + 3位数字 + 校验位(数字或X)
+_ISSN_RE = re.compile(r'(?<![\dXx])(\d{4})-?(\d{3}[\dXx])(?![\dXx])')
+_DOI_RE = re.compile(r'10\.\d{4,9}/\S+')
+_DOI_SEGMENT_RE = re.compile(r'[./\-_]')
+_TRAILING_PAREN_RE = re.compile(r'\s*[(（][^()（）]*[)）]\s*$')
+_NON_WORD_RE = re.compile(r'[\W_]+')
+_FUZZY_STOPWORDS = frozenset(['the', 'and', 'of', 'in', 'for', 'on', 'a', 'an'])
+
+# 会议缩写识别
+_PAREN_RE = re.compile(r'[(（]([^()（）]*)[)）]')
+_YEAR_SUFFIX_RE = re.compile(r"(?:[\s'’\-]*(?:19|20)?\d{2})+$")
+_ACRONYM_TOKEN_RE = re.compile(r"[A-Za-z][A-Za-z0-9&+\-]*(?:['’]\d{2})?")
+_PROCEEDINGS_HINT_RE = re.compile(r'proceedings|conference|symposium|workshop|congress|会议', re.IGNORECASE)
+_PROCEEDINGS_NOISE_RE = re.compile(
+    r"\bproceedings\b(?:\s+of)?(?:\s+the)?|\b(?:19|20)\d{2}\b|\b\d+(?:st|nd|rd|th)\b|\bannual\b",
+    re.IGNORECASE)
+# 出版机构等不作为会议缩写的词
+_PUBLISHER_TOKENS = frozenset(['IEEE', 'ACM', 'CVF', 'IFIP', 'SIAM', 'USENIX', 'LNCS', 'LNAI', 'AAAS', 'IEEE/ACM', 'ACM/IEEE'])
+
+# 论文集名称中按单词提取的缩写最短长度；更短的词（如 AI、IS）在普通期刊名中太常见
+MIN_TOKEN_ACRONYM_LENGTH = 3
+
+# 默认按顺序尝试的期刊名称标签
+DEFAULT_JOURNAL_TAGS = ['T2', 'JO', 'JF', 'J2', 'BT']
+
+# DOI前缀最多尝试的后缀段数，如 10.1016/j.eneco -> 2段
+MAX_DOI_PREFIX_SEGMENTS = 3
+
+
+def normalize_title(name) -> str:
+    """规范化期刊名称：忽略大小写并合并空白"""
+    return ' '.join(str(name).casefold().split())
+
+
+def fuzzy_title_key(name) -> str:
+    """生成宽松匹配键：去掉末尾括号注释、标点和常见虚词
+
+    如 "Omega (United Kingdom)" 与 "OMEGA" 得到相同的键
+    """
+    text = _TRAILING_PAREN_RE.sub('', str(name).casefold().replace('&', ' and '))
+    words = _NON_WORD_RE.sub(' ', text).split()
+    return ''.join(word for word in words if word not in _FUZZY_STOPWORDS)
+
+
+def acronym_key(name) -> str:
+    """缩写的匹配键：大写并去掉标点空白，如 Euro-Par -> EUROPAR"""
+    return _NON_WORD_RE.sub('', str(name)).upper()
+
+
+def is_proceedings_name(name) -> bool:
+    """判断名称是否像会议论文集名称"""
+    return bool(_PROCEEDINGS_HINT_RE.search(str(name)))
+
+
+def proceedings_title_key(name) -> str:
+    """会议论文集名称的匹配键：去掉 Proceedings of、年份、届次、出版机构后生成宽松键
+
+    如 "Proceedings of the 2021 IEEE International Conference on Data Engineering (ICDE)"
+    与 "IEEE International Conference on Data Engineering" 得到相同的键
+    """
+    text = _PAREN_RE.sub(' ', str(name))
+    text = _PROCEEDINGS_NOISE_RE.sub(' ', text)
+    words = [word for word in re.split(r'[\s/]+', text)
+             if word.strip(' -:,').upper() not in _PUBLISHER_TOKENS]
+    return fuzzy_title_key(' '.join(words))
+
+
+def extract_acronyms(name) -> List[str]:
+    """从期刊/会议名称中提取可能的缩写，按可信度排列
+
+    依次为：整个名称本身（较短时）、括号中的内容；只有会议论文集名称才再取名称中含两个以上
+    大写字母、长度不少于 MIN_TOKEN_ACRONYM_LENGTH 的词。普通期刊全名中的词不作为缩写，
+    避免 "Energy AI"、"AI & Society" 中的 AI 匹配到期刊 Artificial Intelligence。
+    全大写的长名称不取词，避免把 "ANNALS OF ..." 中的普通单词当作缩写。
+    """
+    text = str(name).strip()
+    candidates = []
+
+    def add(value, min_length=2):
+        value = _YEAR_SUFFIX_RE.sub('', value.strip(" -:,'’")).strip(" -:,'’")
+        key = acronym_key(value)
+        if len(key) >= min_length and key not in candidates and value.upper() not in _PUBLISHER_TOKENS:
+            candidates.append(key)
+
+    words = text.split()
+    if len(words) <= 2:
+        add(text)
+        # 如 "IEEE TKDE"：去掉出版机构后的部分
+        rest = [word for word in words if word.upper() not in _PUBLISHER_TOKENS]
+        if rest and len(rest) < len(words):
+            add(' '.join(rest))
+    for inner in _PAREN_RE.findall(text):
+        if len(inner.split()) <= 2:
+            add(inner)
+    if is_proceedings_name(text) and not (text.isupper() and len(words) > 2):
+        for token in _ACRONYM_TOKEN_RE.findall(_PAREN_RE.sub(' ', text)):
+            if sum(1 for c in token if c.isupper()) >= 2:
+                add(token, MIN_TOKEN_ACRONYM_LENGTH)
+    return candidates
+
+
+def normalize_issns(value) -> List[str]:
+    """从SN字段中提取所有ISSN，统一为不带连字符的大写形式"""
+    return [(a + b).upper() for a, b in _ISSN_RE.findall(str(value))]
+
+
+def normalize_doi(value) -> Optional[str]:
+    """从DO字段中提取DOI并转为小写，没有则返回None"""
+    match = _DOI_RE.search(str(value))
+    if not match:
+        return None
+    return match.group(0).rstrip('.,;').lower()
+
+
+def doi_prefix_candidates(doi: str) -> List[str]:
+    """生成DOI的候选前缀，按从长到短排列
+
+    如 10.1016/j.eneco.2024.107986 -> [10.1016/j.eneco.2024, 10.1016/j.eneco, 10.1016/j]
+    """
+    registrant, _, suffix = doi.partition('/')
+    stops = [m.start() for m in _DOI_SEGMENT_RE.finditer(suffix) if m.start() > 0]
+    return [f'{registrant}/{suffix[:stop]}' for stop in reversed(stops[:MAX_DOI_PREFIX_SEGMENTS])]
+
+
+class RatingIndex:
+    """编译后的期刊评级索引
+
+    所有评级文件在构建时被展开为哈希表，查询按 ISSN -> 规范化名称 -> 宽松名称
+    -> 会议缩写 -> DOI前缀 的顺序进行，每个候选只做一次字典查找。表中的值为
+    评级系统 -> 评级 的字典。
+    """
+
+    def __init__(self, rating_data, json_attribute_title, json_attribute_rating,
+                 json_attribute_issn=None, identifier_mapping=None, json_attribute_abbr=None,
+                 aliases=None):
+        """构建索引
+
+        Args:
+            rating_data: 评级系统 -> 评级文件原始条目列表
+            json_attribute_title: 评价文件json中 期刊名称对应的 key
+            json_attribute_rating: 评价文件json中 期刊评级对应的 key
+            json_attribute_issn: 评价文件json中 ISSN对应的 key 列表（可选）
+            identifier_mapping: 补充标识映射，包含 issn / doi_prefix -> 期刊名称
+            json_attribute_abbr: 评价文件json中 缩写对应的 key（可选，如CCF的abbr）
+            aliases: 期刊名称别名 -> 规范名称（可选），构建时并入名称表，对所有评级系统生效
+        """
+        self.systems: List[str] = list(rating_data.keys())
+        self.issn_map: Dict[str, Dict[str, object]] = {}
+        self.title_map: Dict[str, Dict[str, object]] = {}
+        self.fuzzy_map: Dict[str, Dict[str, object]] = {}
+        self.doi_prefix_map: Dict[str, Dict[str, object]] = {}
+        # 缩写索引只包含配置了缩写字段的系统；会议缩写单独一张表，用于区分同名的期刊和会议
+        self.acronym_map: Dict[str, Dict[str, object]] = {}
+        self.conference_acronym_map: Dict[str, Dict[str, object]] = {}
+        self.proceedings_map: Dict[str, Dict[str, object]] = {}
+        # 评级文件中的原始名称 -> 评级，用于为未匹配的期刊推荐候选
+        self.names: Dict[str, Dict[str, object]] = {}
+
+        json_attribute_issn = json_attribute_issn or {}
+        json_attribute_abbr = json_attribute_abbr or {}
+        for system, data in rating_data.items():
+            title_key = json_attribute_title[system]
+            rating_key = json_attribute_rating[system]
+            issn_keys = json_attribute_issn.get(system, [])
+            if isinstance(issn_keys, str):
+                issn_keys = [issn_keys]
+            abbr_key = json_attribute_abbr.get(system)
+            for item in data:
+                name = item.get(title_key)
+                if not name:
+                    continue
+                if system == 'CCF':  # ccf 期刊和会议分开
+                    rating = item.get(rating_key) + item.get('type')
+                else:
+                    rating = item.get(rating_key)
+                # 同一系统内先出现的条目优先，与逐条扫描时的结果一致
+                self._add(self.names, ' '.join(str(name).split()), system, rating)
+                self._add(self.title_map, normalize_title(name), system, rating)
+                self._add(self.fuzzy_map, fuzzy_title_key(name), system, rating)
+                for key in issn_keys:
+                    if item.get(key):
+                        for issn in normalize_issns(item[key]):
+                            self._add(self.issn_map, issn, system, rating)
+                if abbr_key:
+                    is_conference = '会议' in str(item.get('type', ''))
+                    abbr = acronym_key(item.get(abbr_key) or '')
+                    if len(abbr) >= 2:
+                        self._add(self.acronym_map, abbr, system, rating)
+                        if is_conference:
+                            self._add(self.conference_acronym_map, abbr, system, rating)
+                    if is_conference:
+                        self._add(self.proceedings_map, proceedings_title_key(name), system, rating)
+
+        # 先并入别名，补充映射中的名称也可以使用别名
+        if aliases:
+            self._fold_aliases(aliases)
+        if identifier_mapping:
+            self._fold_identifiers(identifier_mapping)
+
+    @staticmethod
+    def _add(table, key, system, rating):
+        if not key:
+            return
+        ratings = table.get(key)
+        if ratings is None:
+            table[key] = {system: rating}
+        elif system not in ratings:
+            ratings[system] = rating
+
+    def _fold_aliases(self, aliases: Dict[str, str]):
+        """把别名解析为规范名称的评级，写入规范化名称表和宽松名称表
+
+        别名本身已能匹配到的系统保持不变，只补充缺失的系统；查询时与普通名称一样只需一次字典查找。
+        """
+        unresolved = []
+        for variant, canonical in aliases.items():
+            ratings = self.lookup_title(canonical)
+            if not ratings:
+                unresolved.append(canonical)
+                continue
+            for system, rating in ratings.items():
+                self._add(self.title_map, normalize_title(variant), system, rating)
+                self._add(self.fuzzy_map, fuzzy_title_key(variant), system, rating)
+        if unresolved:
+            print(f'警告: {len(unresolved)} 个别名的规范名称不在评级文件中，例如 {unresolved[0]}')
+
+    def _fold_identifiers(self, identifier_mapping):
+        """将补充映射中的 ISSN / DOI前缀 解析为评级并合并进哈希表"""
+        for issn, name in identifier_mapping.get('issn', {}).items():
+            ratings = self.lookup_title(name)
+            for key in normalize_issns(issn):
+                for system, rating in ratings.items():
+                    self._add(self.issn_map, key, system, rating)
+        for prefix, name in identifier_mapping.get('doi_prefix', {}).items():
+            ratings = self.lookup_title(name)
+            for system, rating in ratings.items():
+                self._add(self.doi_prefix_map, prefix.lower(), system, rating)
+
+    def lookup_title(self, name) -> Dict[str, object]:
+        """按名称查询，先规范化名称后宽松名称，只返回找到的系统"""
+        found = dict(self.title_map.get(normalize_title(name), ()))
+        if len(found) < len(self.systems):
+            for system, rating in self.fuzzy_map.get(fuzzy_title_key(name), {}).items():
+                found.setdefault(system, rating)
+        return found
+
+    def resolve(self, journal_names: Iterable[str] = (), issns: Iterable[str] = (),
+                doi: Optional[str] = None) -> Dict[str, object]:
+        """解析一篇文献在各评级体系中的等级
+
+        Args:
+            journal_names: 期刊名称候选
+            issns: 已规范化的ISSN列表
+            doi: 已规范化的DOI
+
+        Returns:
+            Dict[str, object]: 评级系统 -> 等级，未找到的系统为 'Not Found'
+        """
+        ratings, _ = self.resolve_candidates([(None, name) for name in journal_names], issns, doi)
+        return ratings
+
+    def resolve_candidates(self, candidates: List[Tuple[Optional[str], str]],
+                           issns: Iterable[str] = (), doi: Optional[str] = None):
+        """解析带来源标签的期刊名称候选
+
+        Args:
+            candidates: (标签, 期刊名称) 列表，按优先级排列
+            issns: 已规范化的ISSN列表
+            doi: 已规范化的DOI
+
+        Returns:
+            (评级系统 -> 等级, 首个命中的来源)；来源为标签名、'SN'、'DO'，都未命中时为None
+        """
+        found = {}
+        source = None
+        total = len(self.systems)
+        for issn in issns:
+            if self._merge(found, self.issn_map.get(issn)) and source is None:
+                source = 'SN'
+        if len(found) < total:
+            for tag, name in candidates:
+                if self._merge(found, self.title_map.get(normalize_title(name))) and source is None:
+                    source = tag
+            if len(found) < total:
+                for tag, name in candidates:
+                    if self._merge(found, self.fuzzy_map.get(fuzzy_title_key(name))) and source is None:
+                        source = tag
+            if len(found) < total and self.acronym_map:
+                for tag, name in candidates:
+                    if self._merge_acronyms(found, name) and source is None:
+                        source = tag
+        if doi and len(found) < total and self._merge_doi(found, doi) and source is None:
+            source = 'DO'
+        return {system: found.get(system, NOT_FOUND) for system in self.systems}, source
+
+    def resolve_doi(self, ratings: Dict[str, object], doi: str):
+        """用DOI前缀补全 ratings 中为 'Not Found' 的系统
+
+        Returns:
+            (新的评级字典, 是否有新增)；没有新增时原样返回 ratings
+        """
+        found = {system: rating for system, rating in ratings.items() if rating != NOT_FOUND}
+        if len(found) == len(self.systems) or not self._merge_doi(found, doi):
+            return ratings, False
+        return {system: found.get(system, NOT_FOUND) for system in self.systems}, True
+
+    def _merge_doi(self, found, doi) -> bool:
+        added = False
+        if self.doi_prefix_map:
+            for prefix in doi_prefix_candidates(doi):
+                added = self._merge(found, self.doi_prefix_map.get(prefix)) or added
+        return added
+
+    def _merge_acronyms(self, found, name) -> bool:
+        """会议/期刊缩写匹配：论文集名称优先查会议表"""
+        added = False
+        if is_proceedings_name(name):
+            added = self._merge(found, self.proceedings_map.get(proceedings_title_key(name)))
+            tables = (self.conference_acronym_map, self.acronym_map)
+        else:
+            tables = (self.acronym_map,)
+        for acronym in extract_acronyms(name):
+            for table in tables:
+                added = self._merge(found, table.get(acronym)) or added
+        return added
+
+    @staticmethod
+    def _merge(found, ratings) -> bool:
+        """把 ratings 中尚未找到的系统并入 found，返回是否有新增"""
+        added = False
+        if ratings:
+            for system, rating in ratings.items():
+                if system not in found:
+                    found[system] = rating
+                    added = True
+        return added
+
+
+class JournalResolver:
+    """按配置的标签顺序从RIS条目中取期刊名称候选并查询评级索引
+
+    同一组 (ISSN, 期刊名称) 只解析一次，结果缓存在备忘表中，解析开销与不同期刊数
+    而不是条目数成正比；备忘表可以保存到磁盘供下次运行使用。同时统计每个标签
+    （以及 SN / DO）首先命中的条目数。
+    """
+
+    def __init__(self, rating_index: RatingIndex, journal_tags: Optional[List[str]] = None,
+                 cache_path: Optional[str] = None, fingerprint: str = ''):
+        """
+        Args:
+            rating_index: 编译后的评级索引
+            journal_tags: 按优先级排列的期刊名称标签，默认 DEFAULT_JOURNAL_TAGS
+            cache_path: 跨运行的备忘表文件路径（可选）
+            fingerprint: 评级数据指纹，与缓存文件中的不一致时丢弃缓存
+        """
+        self.rating_index = rating_index
+        self.journal_tags = list(journal_tags or DEFAULT_JOURNAL_TAGS)
+        self.tag_hits: Dict[str, int] = {tag: 0 for tag in self.journal_tags + ['SN', 'DO']}
+        self.misses = 0
+        self.memo: Dict[tuple, tuple] = {}
+        self.memo_hits = 0
+        self.memo_misses = 0
+        self.cache_path = cache_path
+        self.fingerprint = fingerprint
+        self._loaded_size = 0
+        if cache_path:
+            self._load_cache()
+
+    def journal_candidates(self, entry) -> List[Tuple[str, str]]:
+        """按标签顺序取出条目中不重复的期刊名称"""
+        candidates = []
+        seen = set()
+        for tag in self.journal_tags:
+            values = entry.get(tag)
+            if values and values[0] and values[0] not in seen:
+                seen.add(values[0])
+                candidates.append((tag, values[0]))
+        return candidates
+
+    def resolve_entry(self, entry) -> Dict[str, object]:
+        """解析单个条目的评级：评级系统 -> 等级，未找到为 'Not Found'
+
+        返回的字典可能被多个条目共享，调用方不应修改。
+        """
+        candidates = self.journal_candidates(entry)
+        issns = tuple(issn for value in entry.get('SN', ()) for issn in normalize_issns(value))
+        key = (issns, tuple(name for _, name in candidates))
+        cached = self.memo.get(key)
+        if cached is None:
+            self.memo_misses += 1
+            # DOI 因文献而异，不参与备忘，只在按期刊解析后仍有缺失时补查
+            cached = self.rating_index.resolve_candidates(candidates, issns)
+            self.memo[key] = cached
+        else:
+            self.memo_hits += 1
+        ratings, source = cached
+
+        if entry.get('DO') and NOT_FOUND in ratings.values():
+            doi = normalize_doi(entry['DO'][0])
+            if doi:
+                ratings, added = self.rating_index.resolve_doi(ratings, doi)
+                if added and source is None:
+                    source = 'DO'
+
+        if source is None:
+            self.misses += 1
+        else:
+            self.tag_hits[source] = self.tag_hits.get(source, 0) + 1
+        return ratings
+
+    def _load_cache(self):
+        """加载磁盘上的备忘表，指纹不一致或文件损坏时忽略"""
+        if not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"读取期刊解析缓存 {self.cache_path} 时出错: {str(e)}")
+            return
+        if data.get('fingerprint') != self.fingerprint:
+            return
+        for issns, names, ratings, source in data.get('entries', []):
+            self.memo[(tuple(issns), tuple(names))] = (ratings, source)
+        self._loaded_size = len(self.memo)
+
+    def save_cache(self):
+        """把备忘表写回磁盘，没有新增内容时不写"""
+        if not self.cache_path or len(self.memo) == self._loaded_size:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+        data = {
+            'fingerprint': self.fingerprint,
+            'entries': [
+                [list(issns), list(names), ratings, source]
+                for (issns, names), (ratings, source) in self.memo.items()
+            ]
+        }
+        with open(self.cache_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        self._loaded_size = len(self.memo)
+
+
+def rating_data_fingerprint(file_paths: Iterable[str], *settings) -> str:
+    """根据评级文件的路径、大小、修改时间以及相关配置生成指纹"""
+    digest = hashlib.blake2b(digest_size=16)
+    for path in sorted(p for p in file_paths if p):
+        try:
+            stat = os.stat(path)
+            digest.update(f'{path}|{stat.st_size}|{stat.st_mtime_ns}\n'.encode('utf-8'))
+        except OSError:
+            digest.update(f'{path}|missing\n'.encode('utf-8'))
+    digest.update(json.dumps(settings, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def load_identifier_mapping(file_path) -> dict:
+    """加载补充标识映射文件（ISSN / DOI前缀 -> 期刊名称），文件不存在时返回空映射"""
+    if not file_path or not os.path.exists(file_path):
+        return {}
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
@@ -0,0 +1,106 @@
+import sys
+from typing import Dict, Iterator, List, Tuple
+
+# 派生标签：由处理过程生成（标题翻译、评级、引用键），解析时不保留原值
+DERIVED_TAGS = ('C1', 'C2', 'LB')
+
+# 标签顺序的共享缓存：同一来源导出的条目标签顺序基本相同，共用一个元组
+_LAYOUTS: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+def _shared_layout(tags) -> Tuple[str, ...]:
+    tags = tuple(tags)
+    layout = _LAYOUTS.get(tags)
+    if layout is None:
+        # 只在第一次遇到该顺序时 intern
+        layout = tuple(sys.intern(tag) for tag in tags)
+        _LAYOUTS[layout] = layout
+    return layout
+
+
+class RisEntry:
+    """紧凑的RIS条目
+
+    与原来的 tag -> list[str] 字典用法一致（entry[tag]、get、in、items），但：
+    - 标签顺序元组在条目之间共享，标签名经过 intern；
+    - 原始字段以元组保存，修改时整体赋值（entry[tag] = [...]）；
+    - 派生标签 C1/C2/LB 在第一次通过 entry[tag] 访问时才创建列表。
+    """
+
+    __slots__ = ('_tags', '_values')
+
+    def __init__(self, fields=None):
+        """
+        Args:
+            fields: tag -> 值列表 的映射（按标签出现顺序），可选
+        """
+        fields = fields or {}
+        tags = list(fields)
+        tags.extend(tag for tag in DERIVED_TAGS if tag not in fields)
+        self._tags = _shared_layout(tags)
+        self._values = [None if tag in DERIVED_TAGS else tuple(fields[tag]) for tag in self._tags]
+
+    def _index(self, tag) -> int:
+        try:
+            return self._tags.index(tag)
+        except ValueError:
+            return -1
+
+    def __getitem__(self, tag):
+        index = self._index(tag)
+        if index < 0:
+            raise KeyError(tag)
+        values = self._values[index]
+        if values is None:
+            values = self._values[index] = []
+        return values
+
+    def __setitem__(self, tag, values):
+        index = self._index(tag)
+        if index < 0:
+            self._tags = _shared_layout(self._tags + (tag,))
+            self._values.append(values)
+        else:
+            self._values[index] = values
+
+    def get(self, tag, default=None):
+        """与 dict.get 相同；未创建的派生标签返回空元组且不创建列表"""
+        index = self._index(tag)
+        if index < 0:
+            return default
+        values = self._values[index]
+        return () if values is None else values
+
+    def __contains__(self, tag) -> bool:
+        return tag in self._tags
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._tags)
+
+    def __len__(self) -> int:
+        return len(self._tags)
+
+    def keys(self) -> List[str]:
+        return list(self._tags)
+
+    def items(self) -> Iterator[tuple]:
+        for tag, values in zip(self._tags, self._values):
+            yield tag, () if values is None else values
+
+    def state(self) -> tuple:
+        """(标签顺序, 值列表)，用于在进程之间传递条目"""
+        return self._tags, self._values
+
+    @classmethod
+    def from_state(cls, state) -> 'RisEntry':
+        """由 state() 的结果还原条目"""
+        entry = cls.__new__(cls)
+        tags, entry._values = state
+        entry._tags = _LAYOUTS.setdefault(tags, tags)
+        return entry
+
+    def __reduce__(self):
+        return RisEntry.from_state, (self.state(),)
+
+    def __repr__(self) -> str:
+        return f'RisEntry({dict(self.items())!r})'
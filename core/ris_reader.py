@@ -0,0 +1,288 @@
+import codecs
+import gzip
+import mmap
+import os
+import tarfile
+import tempfile
+import zipfile
+from array import array
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+# RIS 记录结束标记
+END_TAG = b'ER  -'
+_BOM = codecs.BOM_UTF8
+_WHITESPACE = b' \t\r\n'
+
+# 编码检测读取的文件前缀长度
+ENCODING_SAMPLE_BYTES = 64 * 1024
+# 没有BOM且不是UTF-8时使用的编码（GBK 的超集，知网等中文导出常用）
+FALLBACK_ENCODING = 'gb18030'
+# 与ASCII兼容的编码可以直接按字节扫描，其他编码（UTF-16/32）先转码为UTF-8
+_ASCII_COMPATIBLE = ('utf-8', 'utf-8-sig', FALLBACK_ENCODING)
+_TRANSCODE_CHUNK = 1024 * 1024
+
+# UTF-32 LE 的BOM以 UTF-16 LE 的BOM开头，需要先检查
+_BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+
+def detect_encoding(sample: bytes) -> str:
+    """根据文件开头的字节判断编码
+
+    依次检查BOM、UTF-16 的零字节分布、前缀能否按UTF-8解码，都不符合时
+    返回 FALLBACK_ENCODING。
+
+    Args:
+        sample: 文件开头的字节，一般取 ENCODING_SAMPLE_BYTES 个
+    """
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+
+    # 没有BOM的UTF-16：ASCII字符的另一半字节为0
+    head = sample[:1024]
+    if head:
+        even_zeros = head[0::2].count(0)
+        odd_zeros = head[1::2].count(0)
+        if odd_zeros > len(head) // 4 and not even_zeros:
+            return 'utf-16-le'
+        if even_zeros > len(head) // 4 and not odd_zeros:
+            return 'utf-16-be'
+
+    try:
+        # 前缀末尾可能截断了一个多字节字符，不作为最终块解码
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return FALLBACK_ENCODING
+
+
+def decode_text(data: bytes, encoding: str) -> str:
+    """按检测出的编码解码；前缀是UTF-8但后面的内容不是时改用 FALLBACK_ENCODING"""
+    try:
+        return data.decode(encoding)
+    except UnicodeDecodeError:
+        if encoding not in ('utf-8', 'utf-8-sig'):
+            raise
+        return data.decode(FALLBACK_ENCODING)
+
+
+def decode_ris_bytes(data: bytes) -> str:
+    """把RIS文件的全部字节解码为文本，自动识别编码（BOM、UTF-8、UTF-16、GBK）"""
+    text = decode_text(data, detect_encoding(data[:ENCODING_SAMPLE_BYTES]))
+    return text[1:] if text.startswith('\ufeff') else text
+
+
+def read_ris_text(file_path: str) -> str:
+    """读取整个RIS文件为文本，自动识别编码"""
+    with open(file_path, 'rb') as f:
+        return decode_ris_bytes(f.read())
+
+
+# 可以直接读取的压缩包格式
+ARCHIVE_SUFFIXES = ('.zip', '.gz', '.tgz')
+
+
+def is_archive(file_path: str) -> bool:
+    """是否为 zip / gz / tar.gz 压缩包"""
+    return file_path.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def _is_ris_member(name: str) -> bool:
+    base = os.path.basename(name.rstrip('/'))
+    return (name.lower().endswith('.ris') and not base.startswith('.')
+            and '__MACOSX' not in name)
+
+
+def iter_archive_members(file_path: str) -> Iterator[Tuple[str, str]]:
+    """在内存中逐个解压压缩包里的RIS文件，不解压到磁盘
+
+    .zip 和 .tar.gz/.tgz 中取所有 .ris 文件（忽略目录、隐藏文件和 __MACOSX），
+    单个 .gz 视为一个RIS文件。每个文件单独识别编码。
+
+    Yields:
+        (压缩包内的文件名, 文本内容)
+    """
+    lower = file_path.lower()
+    if lower.endswith('.zip'):
+        with zipfile.ZipFile(file_path) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and _is_ris_member(info.filename):
+                    with archive.open(info) as f:
+                        yield info.filename, decode_ris_bytes(f.read())
+    elif lower.endswith(('.tar.gz', '.tgz')):
+        with tarfile.open(file_path, 'r:gz') as archive:
+            for member in archive:
+                if member.isfile() and _is_ris_member(member.name):
+                    with archive.extractfile(member) as f:
+                        yield member.name, decode_ris_bytes(f.read())
+    elif lower.endswith('.gz'):
+        with gzip.open(file_path, 'rb') as f:
+            yield os.path.basename(file_path)[:-len('.gz')], decode_ris_bytes(f.read())
+    else:
+        raise ValueError(f'不支持的压缩格式: {file_path}')
+
+
+def iter_fields(raw: bytes) -> Iterator[Tuple[bytes, bytes]]:
+    """逐个返回一条记录中的 (标签, 值)，规则与 parse_ris 相同
+
+    续行以换行符接在上一个值之后；没有值的标签只在有续行时返回。
+    """
+    tag = None
+    parts = None
+    for line in raw.split(b'\n'):
+        line = line.strip()
+        if not line:
+            continue
+        if line[2:5] == b'  -' and line[:2].isupper():
+            if parts:
+                yield tag, b'\n'.join(parts)
+            tag = line[:2]
+            value = line[6:].strip()
+            parts = [value] if value else []
+            if tag == b'ER' and not value:
+                tag = parts = None
+        elif parts is not None:
+            parts.append(line)
+    if parts:
+        yield tag, b'\n'.join(parts)
+
+
+def extract_fields(raw: bytes, tags: Iterable[str], encoding: str = 'utf-8') -> Dict[str, str]:
+    """从一条记录的原始字节中只取出指定标签的第一个值
+
+    用于去重、筛选等只需要少数字段的场景，避免构建完整的条目对象。
+    """
+    wanted = {tag.encode('ascii') for tag in tags}
+    fields = {}
+    for tag, value in iter_fields(raw):
+        if tag in wanted:
+            key = tag.decode('ascii')
+            if key not in fields:
+                fields[key] = value.decode(encoding, errors='replace')
+                if len(fields) == len(wanted):
+                    break
+    return fields
+
+
+def record_fields(raw: bytes, tags: Iterable[str], encoding: str = 'utf-8') -> Dict[str, List[str]]:
+    """从一条记录的原始字节中取出指定标签的全部值"""
+    wanted = {tag.encode('ascii') for tag in tags}
+    fields = {}
+    for tag, value in iter_fields(raw):
+        if tag in wanted:
+            fields.setdefault(tag.decode('ascii'), []).append(
+                value.decode(encoding, errors='replace'))
+    return fields
+
+
+def count_tags(raw: bytes) -> int:
+    """统计一条记录中不同标签的个数，用于挑选信息更完整的重复条目"""
+    return len({tag for tag, _ in iter_fields(raw)})
+
+
+class RisIndex:
+    """基于 mmap 的RIS记录偏移索引
+
+    打开时扫描一遍 ER 行确定每条记录的边界，只保存偏移和长度；记录内容
+    按需从映射中切片，不需要的记录不会被解码成Python对象。
+    UTF-16/32 文件先逐块转码到临时的UTF-8文件再建立索引，记录的编码见 encoding。
+    """
+
+    def __init__(self, file_path: str):
+        """
+        Args:
+            file_path: RIS文件路径
+        """
+        self.file_path = file_path
+        self._file = open(file_path, 'rb')
+        encoding = detect_encoding(self._file.read(ENCODING_SAMPLE_BYTES))
+        if encoding not in _ASCII_COMPATIBLE:
+            self._transcode(encoding)
+            encoding = 'utf-8'
+        self.encoding = 'utf-8' if encoding == 'utf-8-sig' else encoding
+        size = self._file.seek(0, 2)
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        self.offsets = array('q')
+        self.lengths = array('q')
+        self._scan()
+
+    def _transcode(self, encoding: str):
+        """把文件逐块转码为UTF-8临时文件，之后的索引和读取都基于临时文件"""
+        source = self._file
+        source.seek(0)
+        self._file = tempfile.TemporaryFile()
+        decoder = codecs.getincrementaldecoder(encoding)()
+        with source:
+            for chunk in iter(lambda: source.read(_TRANSCODE_CHUNK), b''):
+                self._file.write(decoder.decode(chunk).encode('utf-8'))
+            self._file.write(decoder.decode(b'', final=True).encode('utf-8'))
+        self._file.flush()
+
+    def _scan(self):
+        data = self._map
+        size = len(data)
+        start = self._skip_whitespace(len(_BOM) if data[:len(_BOM)] == _BOM else 0)
+        pos = start
+        while start < size:
+            found = data.find(END_TAG, pos)
+            if found < 0:
+                break
+            pos = found + len(END_TAG)
+            # 只接受除空白外单独成行的 ER 标记
+            line_start = data.rfind(b'\n', 0, found) + 1
+            line_end = data.find(b'\n', found)
+            line_end = size if line_end < 0 else line_end + 1
+            if data[line_start:found].strip() or data[pos:line_end].strip():
+                continue
+            self.offsets.append(start)
+            self.lengths.append(line_end - start)
+            start = pos = self._skip_whitespace(line_end)
+        if start < size:
+            # 最后一条记录缺少 ER 行
+            self.offsets.append(start)
+            self.lengths.append(size - start)
+
+    def _skip_whitespace(self, pos: int) -> int:
+        data = self._map
+        size = len(data)
+        while pos < size and data[pos] in _WHITESPACE:
+            pos += 1
+        return pos
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def raw(self, i: int) -> bytes:
+        """第 i 条记录的原始字节（包含结尾的 ER 行）"""
+        offset = self.offsets[i]
+        return self._map[offset:offset + self.lengths[i]]
+
+    def read(self, offset: int, length: int) -> bytes:
+        """按偏移读取原始字节"""
+        return self._map[offset:offset + length]
+
+    def decode(self, raw: bytes) -> str:
+        """把一条记录的原始字节解码为文本"""
+        return decode_text(raw, self.encoding)
+
+    def records(self) -> Iterator[Tuple[int, int, bytes]]:
+        """依次返回 (偏移, 长度, 原始字节)"""
+        for offset, length in zip(self.offsets, self.lengths):
+            yield offset, length, self._map[offset:offset + length]
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,120 @@
+import codecs
+import os
+from collections import OrderedDict
+from typing import Dict, List
+
+from utils.atomic_io import AtomicWriteBatch
+
+from .progress import as_reporter
+
+# 同时打开的输出文件数上限，超过时关闭最久未写入的文件，之后以追加方式重新打开
+MAX_OPEN_OUTPUTS = 64
+
+_BOM = codecs.BOM_UTF8
+
+
+def format_ris_entry(entry) -> str:
+    """把一个条目格式化为RIS文本（以 ER 行和换行结尾）"""
+    lines = []
+    for tag, values in entry.items():
+        if tag == 'C2':
+            lines.append(f"{tag}  - {''.join(value + ' ' for value in values)}")
+        else:
+            for value in values:
+                lines.append(f"{tag}  - {value}")
+    lines.append("ER  -")
+    lines.append("")
+    return "\n".join(lines)
+
+
+class FanOutWriter:
+    """向多个输出文件追加已编码的字节，限制同时打开的文件数
+
+    内容写入 batch 中的临时文件，batch 提交时才替换目标文件。
+    """
+
+    def __init__(self, output_directory: str, batch: AtomicWriteBatch,
+                 max_open: int = MAX_OPEN_OUTPUTS, bom: bool = True):
+        self.output_directory = output_directory
+        self.batch = batch
+        self.max_open = max_open
+        self.bom = bom
+        self._handles: 'OrderedDict[str, object]' = OrderedDict()
+        self._started = set()
+
+    def write(self, name: str, data: bytes):
+        """向输出文件 name 追加 data，文件第一次写入时截断（并按需写入BOM）"""
+        handle = self._handles.get(name)
+        if handle is None:
+            if len(self._handles) >= self.max_open:
+                _, oldest = self._handles.popitem(last=False)
+                oldest.close()
+            path = self.batch.temp_path(os.path.join(self.output_directory, name))
+            if name in self._started:
+                handle = open(path, 'ab')
+            else:
+                handle = open(path, 'wb')
+                if self.bom:
+                    handle.write(_BOM)
+                self._started.add(name)
+            self._handles[name] = handle
+        else:
+            self._handles.move_to_end(name)
+        handle.write(data)
+
+    def close(self):
+        while self._handles:
+            _, handle = self._handles.popitem()
+            handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def write_outputs(entries, outputs: Dict[str, List], output_directory: str,
+                  max_open: int = MAX_OPEN_OUTPUTS, progress=None, batch=None,
+                  formatter=format_ris_entry, bom: bool = True):
+    """一次遍历条目写出所有输出文件
+
+    每个条目只格式化、编码一次，再追加到它所属的每个输出文件中，写出的代价与
+    输入大小成正比，而不是与所有输出的总大小成正比。结果与对每个输出分别调用
+    to_ris 并以 utf-8-sig 写出完全相同。空的输出不创建文件。
+
+    Args:
+        entries: 全部条目，决定写出顺序；每个输出中的条目顺序须与其一致
+        outputs: 输出文件名 -> 条目列表（同一条目可以出现多次）
+        output_directory: 输出文件夹
+        max_open: 同时打开的文件数上限
+        progress: 进度回调或 ProgressReporter（可选），汇报 'write' 阶段
+        batch: AtomicWriteBatch（可选），由调用方统一提交；为空时写完后立即提交
+        formatter: 条目 -> 文本，默认为RIS格式（例如 BibTeX 使用 bibtex_formatter）
+        bom: 是否在文件开头写入UTF-8 BOM
+    """
+    if batch is None:
+        with AtomicWriteBatch() as batch:
+            return write_outputs(entries, outputs, output_directory, max_open, progress,
+                                 batch, formatter, bom)
+
+    reporter = as_reporter(progress)
+    names = [name for name, members in outputs.items() if members]
+    membership: Dict[int, List[str]] = {}
+    for name in names:
+        for entry in outputs[name]:
+            membership.setdefault(id(entry), []).append(name)
+
+    reporter.start('write', len(entries))
+    written = set()
+    with FanOutWriter(output_directory, batch, max_open, bom) as writer:
+        for entry in entries:
+            reporter.advance()
+            targets = membership.get(id(entry))
+            if not targets:
+                continue
+            data = formatter(entry).encode('utf-8')
+            for name in targets:
+                # 相邻条目之间多一个空行（与 to_ris 相同）
+                writer.write(name, b'\n' + data if name in written else data)
+                written.add(name)
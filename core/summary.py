@@ -0,0 +1,102 @@
+from collections import Counter, defaultdict
+from typing import Dict
+
+from .rating_index import DEFAULT_JOURNAL_TAGS, NOT_FOUND
+
+# 报告中列出的未匹配期刊数量
+TOP_UNMATCHED_JOURNALS = 20
+
+# 报告文件名
+SUMMARY_FILE_NAME = 'summary.txt'
+
+
+class RunSummary:
+    """一次处理的统计：各评级系统的等级分布、未匹配的期刊、各分类的条目数
+
+    在评级阶段随每个条目的评级一起累积（add），不需要再遍历一次条目。
+    """
+
+    def __init__(self, journal_tags=None):
+        """
+        Args:
+            journal_tags: 依次尝试的期刊名称标签，用于记录未匹配的期刊名称
+        """
+        self.journal_tags = list(journal_tags or DEFAULT_JOURNAL_TAGS)
+        self.total = 0
+        self.rated = 0
+        # 评级系统 -> 等级 -> 条目数，未找到记为 NOT_FOUND
+        self.levels: Dict[str, Counter] = defaultdict(Counter)
+        # 所有评级系统都未找到的期刊名称 -> 条目数
+        self.unmatched_journals = Counter()
+        # 输出文件 -> 条目数
+        self.outputs: Dict[str, int] = {}
+        self.duplicates: Dict[str, int] = {}
+        # 未匹配名称 -> [(候选名称, 相似度, 评级)]，见 journal_suggest.suggest_candidates
+        self.suggestions: Dict[str, list] = {}
+
+    def add(self, entry, ratings):
+        """累积一个条目的评级
+
+        Args:
+            entry: 条目（只读取期刊名称标签）
+            ratings: 评级系统 -> 等级，可以为None
+        """
+        self.total += 1
+        matched = False
+        for system, rating in (ratings or {}).items():
+            self.levels[system][str(rating)] += 1
+            if rating != NOT_FOUND:
+                matched = True
+        if matched:
+            self.rated += 1
+            return
+        for tag in self.journal_tags:
+            values = entry.get(tag)
+            if values and values[0].strip():
+                self.unmatched_journals[' '.join(values[0].split())] += 1
+                return
+        self.unmatched_journals[''] += 1
+
+    def to_dict(self) -> dict:
+        return {
+            'total': self.total,
+            'rated': self.rated,
+            'duplicates': dict(self.duplicates),
+            'levels': {system: dict(counts) for system, counts in self.levels.items()},
+            'unmatched_journals': self.unmatched_journals.most_common(TOP_UNMATCHED_JOURNALS),
+            'suggestions': {name: [(candidate, score) for candidate, score, _ in candidates]
+                            for name, candidates in self.suggestions.items()},
+            'outputs': dict(self.outputs),
+        }
+
+    def format_text(self, top: int = TOP_UNMATCHED_JOURNALS) -> str:
+        """生成文本报告"""
+        lines = [f'条目数量: {self.total}，有评级: {self.rated}，未匹配: {self.total - self.rated}']
+        if self.duplicates:
+            lines.append(f"去重删除条目: DOI {self.duplicates.get('doi', 0)}, "
+                         f"标题+年份 {self.duplicates.get('title', 0)}")
+        if self.outputs:
+            lines.append('')
+            lines.append('分类条目数:')
+            for name, count in self.outputs.items():
+                lines.append(f'  {name}: {count}')
+        lines.append('')
+        lines.append('各评级系统等级分布:')
+        for system, counts in self.levels.items():
+            # 等级按名称排序，未找到放在最后
+            levels = sorted((level for level in counts if level != NOT_FOUND))
+            parts = [f'{level} {counts[level]}' for level in levels]
+            parts.append(f'未找到 {counts.get(NOT_FOUND, 0)}')
+            lines.append(f"  {system}: {', '.join(parts)}")
+        unmatched = self.unmatched_journals.most_common(top)
+        if unmatched:
+            lines.append('')
+            lines.append(f'未匹配的期刊（前 {top} 个）:')
+            for journal, count in unmatched:
+                line = f"  {journal or '(无期刊名称)'}: {count}"
+                candidates = self.suggestions.get(journal)
+                if candidates:
+                    candidate, score, _ = candidates[0]
+                    line += f'  -> {candidate} ({score:.2f})'
+                lines.append(line)
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,170 @@
+import csv
+import os
+from typing import Dict, List
+
+from .bibtex_writer import CitationKeyRegistry, entry_issns, entry_year
+from .dedup import entry_doi
+from .progress import as_reporter
+from .rating_index import DEFAULT_JOURNAL_TAGS
+
+# 支持的表格格式：csv 只依赖标准库，parquet 需要安装 pyarrow（可选）
+TABLE_FORMATS = ('csv', 'parquet')
+
+# 表格文件名（不含扩展名）
+TABLE_FILE_NAME = 'results'
+
+# 每列一个条目属性，之后依次是每个评级系统一列、每个分类一列
+TABLE_BASE_COLUMNS = ('key', 'title', 'title_zh', 'authors', 'journal', 'year', 'doi', 'issn')
+
+# Parquet 每个行组的行数，写满一组才转换为列并写出
+PARQUET_ROW_GROUP_SIZE = 10000
+
+def _single_line(entry, *tags) -> str:
+    """第一个非空标签的第一个值，续行合并为一行"""
+    for tag in tags:
+        values = entry.get(tag)
+        if values:
+            return ' '.join(values[0].split())
+    return ''
+
+
+def entry_ratings(entry) -> Dict[str, str]:
+    """从C2中取出条目的评级：评级系统 -> 等级（C2中的值形如 'CCF:A;'）"""
+    ratings = {}
+    for value in entry.get('C2', ()):
+        system, _, rating = value.rstrip(';').partition(':')
+        ratings[system] = rating
+    return ratings
+
+
+def table_columns(rating_systems: List[str], output_names: List[str]) -> List[str]:
+    """表格的列名：基本列 + rating_<评级系统> + criteria_<分类>"""
+    return (list(TABLE_BASE_COLUMNS)
+            + [f'rating_{system}' for system in rating_systems]
+            + [f'criteria_{name}' for name in output_names])
+
+
+def iter_table_rows(entries, outputs: Dict[str, List], rating_systems: List[str],
+                    key_registry: CitationKeyRegistry, journal_tags=None, rated_only: bool = False):
+    """逐行生成表格内容，每个条目一行，未评级的条目评级列为空
+
+    Args:
+        entries: 全部条目，决定行的顺序
+        outputs: 分类名称 -> 条目列表
+        rating_systems: 评级系统列表
+        key_registry: citation key 登记表，key 列与 LB / BibTeX 中的 key 一致
+        journal_tags: 依次尝试的期刊名称标签
+        rated_only: 为True时只输出有评级（C2）的条目
+    Returns:
+        生成器，每行为一个列表，分类列为 bool
+    """
+    journal_tags = journal_tags or DEFAULT_JOURNAL_TAGS
+    names = list(outputs)
+    membership: Dict[int, set] = {}
+    for name, members in outputs.items():
+        for entry in members:
+            membership.setdefault(id(entry), set()).add(name)
+
+    for entry in entries:
+        ratings = entry_ratings(entry)
+        if rated_only and not ratings:
+            continue
+        matched = membership.get(id(entry), ())
+        row = [
+            key_registry.key_for(entry),
+            _single_line(entry, 'TI', 'T1'),
+            _single_line(entry, 'C1'),
+            '; '.join(entry.get('AU', ())),
+            _single_line(entry, *journal_tags),
+            entry_year(entry),
+            entry_doi(entry) or '',
+            ', '.join(entry_issns(entry)),
+        ]
+        row.extend(ratings.get(system, '') for system in rating_systems)
+        row.extend(name in matched for name in names)
+        yield row
+
+
+def write_csv(path: str, columns: List[str], rows, progress=None):
+    """逐行写出CSV（utf-8-sig，Excel 可直接打开），分类列写为 1 / 0"""
+    reporter = as_reporter(progress)
+    flag_start = len(columns) - sum(1 for column in columns if column.startswith('criteria_'))
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(row[:flag_start] + [int(flag) for flag in row[flag_start:]])
+            reporter.advance()
+
+
+def write_parquet(path: str, columns: List[str], rows, progress=None,
+                  row_group_size: int = PARQUET_ROW_GROUP_SIZE):
+    """按行组写出Parquet，内存中最多保留一个行组；需要 pyarrow"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    reporter = as_reporter(progress)
+    schema = pa.schema([
+        (column, pa.bool_() if column.startswith('criteria_') else pa.string())
+        for column in columns
+    ])
+
+    def to_table(group):
+        return pa.Table.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(zip(*group), schema)],
+            schema=schema)
+
+    # 没有任何行时也写出只有表头（schema）的文件
+    with pq.ParquetWriter(path, schema) as writer:
+        group = []
+        for row in rows:
+            group.append(row)
+            reporter.advance()
+            if len(group) >= row_group_size:
+                writer.write_table(to_table(group))
+                group = []
+        if group:
+            writer.write_table(to_table(group))
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def write_tables(entries, outputs: Dict[str, List], rating_systems: List[str],
+                 output_directory: str, formats, batch, key_registry: CitationKeyRegistry,
+                 progress=None, journal_tags=None, rated_only: bool = False):
+    """写出分类结果表格，每种格式一个文件，每个条目一行
+
+    Args:
+        entries: 全部条目
+        outputs: 分类名称 -> 条目列表（与写出的 .ris 文件对应）
+        rating_systems: 评级系统列表，每个一列
+        output_directory: 输出文件夹
+        formats: 要写出的表格格式，取值见 TABLE_FORMATS
+        batch: AtomicWriteBatch，与其他输出文件一起提交
+        key_registry: citation key 登记表
+        progress: 进度回调或 ProgressReporter（可选），汇报 'write' 阶段
+        journal_tags: 依次尝试的期刊名称标签
+        rated_only: 为True时只输出有评级的条目
+    """
+    reporter = as_reporter(progress)
+    names = [name for name, members in outputs.items() if members]
+    columns = table_columns(rating_systems, names)
+    total = sum(1 for entry in entries if entry.get('C2')) if rated_only else len(entries)
+    for table_format in formats:
+        if table_format == 'parquet' and not parquet_available():
+            print('未安装 pyarrow，跳过 Parquet 输出')
+            continue
+        path = batch.temp_path(os.path.join(output_directory, f'{TABLE_FILE_NAME}.{table_format}'))
+        rows = iter_table_rows(entries, {name: outputs[name] for name in names},
+                               rating_systems, key_registry, journal_tags, rated_only)
+        reporter.start('write', total)
+        if table_format == 'csv':
+            write_csv(path, columns, rows, reporter)
+        elif table_format == 'parquet':
+            write_parquet(path, columns, rows, reporter)
@@ -20,6 +20,11 @@ sys.path.append(project_root)
 from core.paper_processor import process_ris_file
 from core.data_manager import DataManager
 from core.data_types import RatingSystem
+from core.cancellation import CancellationToken, ProcessingCancelled
+from core.progress import STAGE_NAMES
+from core.ris_reader import is_archive
+from core.jsonl_store import is_jsonl
+from utils.atomic_io import atomic_write_json
 
 def get_resource_path(relative_path):
     """获取资源的绝对路径"""
@@ -60,7 +65,7 @@ class DropArea(QWidget):
         self.setAcceptDrops(True)
         
         layout = QVBoxLayout()
-        self.label = QLabel("将RIS文件拖放到这里或者点击选择")
+        self.label = QLabel("将RIS文件或压缩包(.zip/.gz)拖放到这里或者点击选择")
         self.label.setAlignment(Qt.AlignCenter)
         self.label.setStyleSheet("""
             QLabel {
@@ -122,7 +127,7 @@ class DropArea(QWidget):
         files = event.mimeData().urls()
         for url in files:
             file_path = url.toLocalFile()
-            if file_path.lower().endswith('.ris'):
+            if file_path.lower().endswith('.ris') or is_archive(file_path) or is_jsonl(file_path):
                 # 更新显示的文件名
                 file_name = os.path.basename(file_path)
                 self.label.setText(f"当前文件：{file_name}")
@@ -137,17 +142,22 @@ class DropArea(QWidget):
             file_name = os.path.basename(file_path)
             self.label.setText(f"当前文件：{file_name}")
         else:
-            self.label.setText("将RIS文件拖放到这里或者点击选择")
+            self.label.setText("将RIS文件或压缩包(.zip/.gz)拖放到这里或者点击选择")
 
 class ProcessThread(QThread):
     """处理RIS文件的线程"""
-    progress = pyqtSignal(int, int)  # 发送进度信号
-    finished = pyqtSignal(bool)  # 发送完成信号
+    progress = pyqtSignal(str, int, int)  # 发送进度信号：阶段、当前、总数
+    finished = pyqtSignal(object)  # 发送完成信号，参数为处理统计 RunSummary
     error = pyqtSignal(str)  # 发送错误信号
+    cancelled = pyqtSignal(bool)  # 发送取消信号，参数为是否实际写出了部分结果
 
     def __init__(self, file_path, selected, selection_profile, path_rating_file,
                  json_attribute_title, json_attribute_rating, output_path,
-                 trans_ti, trans_ab, token_missuo, token_linuxdo):
+                 trans_ti, trans_ab, token_missuo, token_linuxdo,
+                 json_attribute_issn=None, path_identifier_file=None,
+                 json_attribute_abbr=None, journal_tags=None, resolution_cache_path=None,
+                 near_duplicates=None, library_path=None, cancel_token=None,
+                 output_formats=None, journal_aliases=None):
         super().__init__()
         self.file_path = file_path
         self.selected = selected
@@ -160,6 +170,16 @@ class ProcessThread(QThread):
         self.trans_ab = trans_ab
         self.token_missuo = token_missuo
         self.token_linuxdo = token_linuxdo
+        self.json_attribute_issn = json_attribute_issn
+        self.path_identifier_file = path_identifier_file
+        self.json_attribute_abbr = json_attribute_abbr
+        self.journal_tags = journal_tags
+        self.resolution_cache_path = resolution_cache_path
+        self.near_duplicates = near_duplicates
+        self.library_path = library_path
+        self.cancel_token = cancel_token or CancellationToken()
+        self.output_formats = output_formats
+        self.journal_aliases = journal_aliases
 
     def run(self):
         try:
@@ -175,9 +195,21 @@ class ProcessThread(QThread):
                 trans_ab=self.trans_ab,
                 tokenMissuo=self.token_missuo,
                 tokenLinuxdo=self.token_linuxdo,
-                progress_callback=self.progress.emit
+                progress_callback=self.progress.emit,
+                json_attribute_issn=self.json_attribute_issn,
+                path_identifier_file=self.path_identifier_file,
+                json_attribute_abbr=self.json_attribute_abbr,
+                journal_tags=self.journal_tags,
+                resolution_cache_path=self.resolution_cache_path,
+                near_duplicates=self.near_duplicates,
+                library_path=self.library_path,
+                cancel_token=self.cancel_token,
+                output_formats=self.output_formats,
+                journal_aliases=self.journal_aliases
             )
             self.finished.emit(result)
+        except ProcessingCancelled as e:
+            self.cancelled.emit(e.partial_written)
         except Exception as e:
             self.error.emit(str(e))
 
@@ -272,6 +304,15 @@ class RatingSystemDialog(QDialog):
         type_mapping_layout.addWidget(self.type_mapping_input)
         mapping_layout.addLayout(type_mapping_layout)
         
+        # 缩写属性（可选）
+        abbr_mapping_layout = QHBoxLayout()
+        abbr_mapping_label = QLabel("缩写字段:")
+        self.abbr_mapping_input = QLineEdit()
+        self.abbr_mapping_input.setPlaceholderText("例如：abbr（可选）")
+        abbr_mapping_layout.addWidget(abbr_mapping_label)
+        abbr_mapping_layout.addWidget(self.abbr_mapping_input)
+        mapping_layout.addLayout(abbr_mapping_layout)
+        
         file_layout.addWidget(mapping_group)
         layout.addWidget(file_group)
         
@@ -327,6 +368,11 @@ class RatingSystemDialog(QDialog):
         if type_field:
             mapping["type"] = type_field
         
+        # 如果有缩写字段，添加到映射中
+        abbr_field = self.abbr_mapping_input.text().strip()
+        if abbr_field:
+            mapping["abbr"] = abbr_field
+        
         return {
             "system_id": self.id_input.text().strip(),
             "name": self.name_input.text().strip(),
@@ -693,6 +739,8 @@ class SettingsDialog(QDialog):
                     dialog.level_mapping_input.setText(mapping.get('level', ''))
                     if 'type' in mapping:
                         dialog.type_mapping_input.setText(mapping['type'])
+                    if 'abbr' in mapping:
+                        dialog.abbr_mapping_input.setText(mapping['abbr'])
         
         if dialog.exec_() == QDialog.Accepted:
             data = dialog.get_data()
@@ -1209,7 +1257,7 @@ class MainWindow(QMainWindow):
                         "ZUFE": "ratings/zufe.json"
                     },
                     "json_attribute_mapping": {
-                        "CCF": {"paper_name": "fullname", "level": "rank", "type": "type"},
+                        "CCF": {"paper_name": "fullname", "level": "rank", "type": "type", "abbr": "abbr"},
                         "FMS": {"paper_name": "Paper_name", "level": "Level"},
                         "AJG": {"paper_name": "Paper_name", "level": "Level"},
                         "ZUFE": {"paper_name": "Paper_name", "level": "Level"}
@@ -1219,8 +1267,7 @@ class MainWindow(QMainWindow):
                     "output_directory": "",
                     "subfolder": ""
                 }
-                with open(config_path, 'w', encoding='utf-8') as f:
-                    json.dump(default_config, f, ensure_ascii=False, indent=4)
+                atomic_write_json(config_path, default_config, indent=4)
             
             # 初始化数据管理器，传入正确的参数
             self.data_manager = DataManager(base_path=data_path, config_path=config_path)
@@ -1631,6 +1678,19 @@ class MainWindow(QMainWindow):
         # 将进度条添加到布局中（在生成按钮下方）
         button_layout.addWidget(self.progress_bar)
         
+        # 暂停 / 取消按钮，处理过程中显示
+        self.pause_btn = StyledButton("暂停")
+        self.pause_btn.setMinimumHeight(40)
+        self.pause_btn.clicked.connect(self.toggle_pause)
+        self.pause_btn.hide()
+        button_layout.addWidget(self.pause_btn)
+        
+        self.cancel_btn = StyledButton("取消")
+        self.cancel_btn.setMinimumHeight(40)
+        self.cancel_btn.clicked.connect(self.cancel_processing)
+        self.cancel_btn.hide()
+        button_layout.addWidget(self.cancel_btn)
+        
         middle_layout.addWidget(button_container)
         
         # 添加弹性空间
@@ -1869,7 +1929,7 @@ class MainWindow(QMainWindow):
 
     def select_file(self):
         file_path, _ = QFileDialog.getOpenFileName(
-            self, "选择RIS文件", "", "RIS文件 (*.ris)")
+            self, "选择RIS文件", "", "RIS文件 (*.ris *.zip *.gz *.tgz *.jsonl);;RIS文件 (*.ris);;压缩包 (*.zip *.gz *.tgz);;JSON Lines (*.jsonl)")
         if file_path:
             # 更新拖放区域显示的文件名
             self.drop_area.update_file_name(file_path)
@@ -1930,17 +1990,66 @@ class MainWindow(QMainWindow):
             else:  # Linux
                 os.system(f'xdg-open "{file_path}"')
 
-    def update_progress(self, current, total):
-        """更新进度条"""
+    def update_progress(self, stage, current, total):
+        """更新进度条（更新频率已在处理线程中合并）"""
+        stage_name = STAGE_NAMES.get(stage, stage)
+        if not total:
+            # 总数未知时显示忙碌状态
+            self.progress_bar.setRange(0, 0)
+            self.progress_bar.setFormat(f'{stage_name}中...')
+            return
         percentage = int((current / total) * 100)
+        self.progress_bar.setRange(0, 100)
         self.progress_bar.setValue(percentage)
-        self.progress_bar.setFormat(f'处理中... {percentage}% ({current}/{total})')
+        self.progress_bar.setFormat(f'{stage_name}中... {percentage}% ({current}/{total})')
+
+    def toggle_pause(self):
+        """暂停或继续当前的处理"""
+        token = self.process_thread.cancel_token
+        if token.paused:
+            token.resume()
+            self.pause_btn.setText("暂停")
+        else:
+            token.pause()
+            self.pause_btn.setText("继续")
+            self.progress_bar.setFormat('已暂停')
+
+    def cancel_processing(self):
+        """取消当前的处理，可选择保留已完成的部分结果"""
+        reply = QMessageBox.question(
+            self, "取消处理", "是否保留已完成的部分结果？\n（已分类但未翻译的条目也会写出）",
+            QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel, QMessageBox.No)
+        if reply == QMessageBox.Cancel:
+            return
+        self.process_thread.cancel_token.cancel(keep_partial=reply == QMessageBox.Yes)
+        self.cancel_btn.setEnabled(False)
+        self.pause_btn.setEnabled(False)
+        self.progress_bar.setFormat('正在取消...')
 
-    def process_finished(self, success):
-        """处理完成的回调"""
+    def reset_processing_controls(self):
+        """处理结束后恢复按钮和进度条"""
         self.progress_bar.hide()
         self.generate_btn.setEnabled(True)
-        if success:
+        for btn in (self.pause_btn, self.cancel_btn):
+            btn.hide()
+            btn.setEnabled(True)
+        self.pause_btn.setText("暂停")
+
+    def process_cancelled(self, partial_written):
+        """处理被取消的回调，partial_written 为是否实际写出了部分结果"""
+        self.reset_processing_controls()
+        if partial_written:
+            self.update_file_list()
+            QMessageBox.information(self, "已取消", "处理已取消，已写出完成的部分结果。")
+        elif self.process_thread.cancel_token.keep_partial:
+            QMessageBox.information(self, "已取消", "处理已取消。分类尚未完成，没有可写出的部分结果。")
+        else:
+            QMessageBox.information(self, "已取消", "处理已取消。")
+
+    def process_finished(self, summary):
+        """处理完成的回调，summary 为 process_ris_file 返回的 RunSummary"""
+        self.reset_processing_controls()
+        if summary:
             try:
                 self.update_file_list()
                 # 获取处理后的文件统计
@@ -1951,7 +2060,8 @@ class MainWindow(QMainWindow):
                     QMessageBox.information(
                         self, 
                         "成功", 
-                        f"文件处理完成！\n生成了 {len(files)} 个分类文件。"
+                        f"文件处理完成！\n生成了 {len(files)} 个分类文件。\n\n"
+                        f"{summary.format_text(top=10)}"
                     )
             except Exception as e:
                 print(f"处理完成后更新界面时出错: {str(e)}")
@@ -1959,8 +2069,7 @@ class MainWindow(QMainWindow):
 
     def process_error(self, error_msg):
         """处理错误的回调"""
-        self.progress_bar.hide()
-        self.generate_btn.setEnabled(True)
+        self.reset_processing_controls()
         QMessageBox.critical(self, "错误", f"处理文件时出错：{error_msg}")
 
     def manual_generate(self):
@@ -2057,6 +2166,15 @@ class MainWindow(QMainWindow):
             system: mapping['level']
             for system, mapping in json_attribute_mapping.items()
         }
+        json_attribute_issn = {
+            system: [mapping[key] for key in ('issn', 'eissn') if key in mapping]
+            for system, mapping in json_attribute_mapping.items()
+        }
+        json_attribute_abbr = {
+            system: mapping['abbr']
+            for system, mapping in json_attribute_mapping.items()
+            if 'abbr' in mapping
+        }
 
         # 构建完整的输出路径
         full_output_path = os.path.join(self.output_directory, self.subfolder_input.text().strip())
@@ -2065,6 +2183,8 @@ class MainWindow(QMainWindow):
         self.generate_btn.setEnabled(False)
         self.progress_bar.setValue(0)
         self.progress_bar.show()
+        self.pause_btn.show()
+        self.cancel_btn.show()
 
         # 创建并启动处理线程
         self.process_thread = ProcessThread(
@@ -2078,11 +2198,21 @@ class MainWindow(QMainWindow):
             trans_ti=trans_ti,
             trans_ab=trans_ab,
             token_missuo=token_missuo,
-            token_linuxdo=token_linuxdo
+            token_linuxdo=token_linuxdo,
+            json_attribute_issn=json_attribute_issn,
+            path_identifier_file=self.data_manager.config.identifier_file_path,
+            json_attribute_abbr=json_attribute_abbr,
+            journal_tags=self.data_manager.config.journal_tags,
+            resolution_cache_path=self.data_manager.get_resolution_cache_path(),
+            near_duplicates=self.data_manager.config.near_duplicate_mode or None,
+            library_path=self.data_manager.get_library_path(),
+            output_formats=self.data_manager.config.output_formats,
+            journal_aliases=self.data_manager.get_journal_aliases()
         )
         self.process_thread.progress.connect(self.update_progress)
         self.process_thread.finished.connect(self.process_finished)
         self.process_thread.error.connect(self.process_error)
+        self.process_thread.cancelled.connect(self.process_cancelled)
         self.process_thread.start()
 
     def check_rating_files(self, selected_criteria):
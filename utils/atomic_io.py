@@ -0,0 +1,105 @@
+import json
+import os
+import uuid
+from typing import List, Tuple
+
+
+def _temp_path_for(target_path: str) -> str:
+    """目标文件同目录下的临时文件名（同一文件系统内改名才是原子的）"""
+    directory, name = os.path.split(os.path.abspath(target_path))
+    return os.path.join(directory, f'.{name}.{uuid.uuid4().hex[:8]}.tmp')
+
+
+def _fsync_file(path: str):
+    # Windows 上 fsync 需要可写的句柄
+    with open(path, 'ab') as f:
+        os.fsync(f.fileno())
+
+
+def _fsync_directory(directory: str):
+    """同步目录项，使改名本身落盘；Windows 不支持打开目录，忽略"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class AtomicWriteBatch:
+    """一批原子写入：内容先写入临时文件，commit 时再统一替换目标文件
+
+    目标文件在任何时刻要么是旧内容要么是新内容，崩溃或出错时不会留下写了
+    一半的文件。所有文件的 fsync 集中在 commit 时一次完成，写入过程中没有
+    逐个文件的同步等待；每个目录在改名后只同步一次。
+
+    用法:
+        with AtomicWriteBatch() as batch:
+            with open(batch.temp_path(path), 'wb') as f:
+                f.write(data)
+        # 正常退出时 commit，出现异常时 abort
+    """
+
+    def __init__(self):
+        self._pending: List[Tuple[str, str]] = []
+        self._temp_paths = {}
+
+    def temp_path(self, target_path: str) -> str:
+        """目标文件对应的临时文件路径，同一目标多次调用返回同一路径"""
+        target_path = os.path.abspath(target_path)
+        temp_path = self._temp_paths.get(target_path)
+        if temp_path is None:
+            temp_path = _temp_path_for(target_path)
+            # 先创建文件占用文件名
+            open(temp_path, 'xb').close()
+            self._temp_paths[target_path] = temp_path
+            self._pending.append((temp_path, target_path))
+        return temp_path
+
+    def commit(self):
+        """同步所有临时文件后替换目标文件"""
+        for temp_path, _ in self._pending:
+            _fsync_file(temp_path)
+        directories = set()
+        for temp_path, target_path in self._pending:
+            os.replace(temp_path, target_path)
+            directories.add(os.path.dirname(target_path))
+        for directory in directories:
+            _fsync_directory(directory)
+        self._pending.clear()
+        self._temp_paths.clear()
+
+    def abort(self):
+        """删除临时文件，目标文件保持原样"""
+        for temp_path, _ in self._pending:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+        self._pending.clear()
+        self._temp_paths.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+
+def atomic_write_text(path: str, text: str, encoding: str = 'utf-8'):
+    """原子地写入文本文件"""
+    with AtomicWriteBatch() as batch:
+        with open(batch.temp_path(path), 'w', encoding=encoding) as f:
+            f.write(text)
+
+
+def atomic_write_json(path: str, data, indent=None):
+    """原子地写入JSON文件（ensure_ascii=False）"""
+    atomic_write_text(path, json.dumps(data, ensure_ascii=False, indent=indent))